@@ -1,8 +1,9 @@
-import io
 import tempfile
 import os
+import shutil
 import sys
 from pathlib import Path
+from flask import Flask, request, jsonify
 
 # Add the current directory to Python path for imports
 current_dir = Path(__file__).parent
@@ -24,7 +25,12 @@ except ImportError:
     print("⚠️  Career suggester not found. Suggestions disabled.")
     CAREER_SUGGESTER_AVAILABLE = False
 
+from utility.extractors import SUPPORTED_EXTENSIONS, extract_document_text
+from utility.taxonomy import get_taxonomy
+from utility.uploads import init_uploads, upload_path
+
 app = Flask(__name__)
+init_uploads(app)
 
 def process_resume_with_parser(file_stream, filename):
     """
@@ -36,19 +42,19 @@ def process_resume_with_parser(file_stream, filename):
         return fallback_basic_extraction(file_stream, filename)
     
     try:
-        # Create a temporary file to work with the ResumeParser
-        # since it expects a file path or BytesIO with proper name attribute
-        file_stream.seek(0)
-        
-        # Create a BytesIO object with the filename attribute
-        resume_file = io.BytesIO(file_stream.read())
-        resume_file.name = filename
-        
-        # Initialize the ResumeParser
-        parser = ResumeParser(resume_file)
-        
-        # Extract data using the sophisticated parser
-        extracted_data = parser.get_extracted_data()
+        # ResumeParser takes a path and picks the format by its extension.
+        # Spooled uploads already have one; small in-memory uploads are
+        # copied to a temp file in chunks rather than duplicated in memory
+        suffix = os.path.splitext(filename)[1].lower()
+        path = upload_path(file_stream)
+        if path and path.endswith(suffix):
+            extracted_data = ResumeParser(path).get_extracted_data()
+        else:
+            file_stream.seek(0)
+            with tempfile.NamedTemporaryFile(suffix=suffix, prefix="resume-") as resume_file:
+                shutil.copyfileobj(file_stream, resume_file)
+                resume_file.flush()
+                extracted_data = ResumeParser(resume_file.name).get_extracted_data()
         
         # Get career suggestions based on extracted skills
         career_suggestions = []
@@ -88,29 +94,21 @@ def process_resume_with_parser(file_stream, filename):
 
 def fallback_basic_extraction(file_stream, filename):
     """
-    Fallback to basic PDF extraction if the advanced parser fails
+    Fallback to basic text extraction if the advanced parser fails
     """
     try:
-        import PyPDF2
-        
-        file_stream.seek(0)
-        reader = PyPDF2.PdfReader(file_stream)
-        
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text()
+        text, extraction_method, pages = extract_document_text(file_stream, filename)
+        if pages is None and filename.lower().endswith('.pdf'):
+            import PyPDF2
+            file_stream.seek(0)
+            pages = len(PyPDF2.PdfReader(file_stream).pages)
         
         # Basic skill extraction
         skills = []
-        skill_keywords = ['python', 'java', 'javascript', 'sql', 'html', 'css', 'react', 'node', 'git',
-                         'machine learning', 'data science', 'ai', 'tensorflow', 'pytorch', 'docker',
-                         'kubernetes', 'aws', 'azure', 'mongodb', 'postgresql', 'spring', 'django',
-                         'flask', 'angular', 'vue', 'c++', 'c#', 'scala', 'kotlin', 'swift']
-        
         text_lower = text.lower()
-        for skill in skill_keywords:
+        for skill, title in get_taxonomy().fallback_skills:
             if skill in text_lower:
-                skills.append(skill.title())
+                skills.append(title)
         
         # Basic name extraction (first non-empty line)
         lines = [line.strip() for line in text.split('\n') if line.strip()]
@@ -151,12 +149,12 @@ def fallback_basic_extraction(file_stream, filename):
                 'experience_details': []
             },
             'document_info': {
-                'no_of_pages': len(reader.pages)
+                'no_of_pages': pages if pages is not None else 'Not found'
             },
             'career_suggestions': suggest_careers({'skills': skills}) if CAREER_SUGGESTER_AVAILABLE else [],
             'text_preview': text[:300] + '...' if len(text) > 300 else text,
             'total_text_length': len(text),
-            'extraction_method': 'Basic PDF Parser (Fallback)'
+            'extraction_method': f'Basic Parser (Fallback, {extraction_method})'
         }
         
     except Exception as e:
@@ -197,12 +195,11 @@ def analyze_resume():
             return jsonify({'error': 'No file selected'}), 400
         
         # Support multiple file formats
-        allowed_extensions = ['.pdf', '.docx', '.doc', '.txt']
         file_extension = os.path.splitext(file.filename)[1].lower()
         
-        if file_extension not in allowed_extensions:
+        if file_extension not in SUPPORTED_EXTENSIONS:
             return jsonify({
-                'error': f'Unsupported file format. Please upload: {", ".join(allowed_extensions)}'
+                'error': f'Unsupported file format. Please upload: {", ".join(SUPPORTED_EXTENSIONS)}'
             }), 400
         
         # Process the resume using the enhanced parser
@@ -247,10 +244,6 @@ def supported_formats():
                 'extension': '.docx',
                 'description': 'Microsoft Word Document'
             },
-            {
-                'extension': '.doc',
-                'description': 'Microsoft Word Document (Legacy)'
-            },
             {
                 'extension': '.txt',
                 'description': 'Plain Text File'
@@ -267,4 +260,5 @@ if __name__ == '__main__':
     print("📋 Features: Advanced NLP extraction, Multiple file formats, Career suggestions")
     print("🌐 Access: http://localhost:5000")
     
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    # Development server only; for production run APP_MODULE=Integrated with wsgi.py
+    app.run(debug=os.getenv('FLASK_DEBUG', 'true').lower() == 'true', port=5000)
\ No newline at end of file
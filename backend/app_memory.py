@@ -1,91 +1,78 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from suggester.suggestor import suggest_careers
+from suggester.suggestor import rank_careers, suggest_careers
 from utility.affinda import Affinda
-from utility.ai_agent import career_guidance_agent, get_industry_trends, generate_interview_questions
+from utility.ai_agent import cached_career_guidance, career_guidance_agent, get_industry_trends, generate_interview_questions, guidance_cache_stats, prefetch_follow_ups, rule_based_career_advice
+from utility.matcher import ResumeMatcher, resume_index
+from utility.dedup import DUPLICATE_POLICY, duplicate_index, minhash_signature
+from utility.llm_scheduler import Priority, llm_scheduler
+from utility.overload import OVERLOAD_MODE, overload_controller
+from utility.prefetch import prefetcher
+from utility.profiling import admin_authorized, get_profile, init_profiling, list_profiles, set_fingerprint, stage
+from utility.singleflight import SingleFlight
+from utility.responses import configure_json, init_compression, project_fields
+from utility.section_cache import map_segments, section_cache, split_sections
+from utility.taxonomy import get_taxonomy
+from utility.uploads import init_uploads, upload_buffer, upload_budget
+from utility.extractors import PdfExtractor, SUPPORTED_EXTENSIONS, extract_document_text, is_supported, ocr_document_text
 import io
+import os
 import re
+import hashlib
 from datetime import datetime
 
 app = Flask(__name__)
 CORS(app)
+configure_json(app)
+init_compression(app)
+init_profiling(app)
+init_uploads(app)
 
 # -----------------------------
-# PDF Processing Logic (fallback)
+# Document Processing Logic (fallback)
 # -----------------------------
 
 def process_pdf_in_memory(file_stream):
     try:
-        text = ""
-        extraction_method = None
-
-        # Try pdfminer
-        try:
-            from pdfminer.high_level import extract_text
-            file_stream.seek(0)
-            text = extract_text(file_stream)
-            extraction_method = "pdfminer"
-        except Exception as e:
-            print(f"⚠️ pdfminer failed: {e}")
-
-        # Fallback: PyPDF2
-        if not text.strip():
-            try:
-                import PyPDF2
-                file_stream.seek(0)
-                reader = PyPDF2.PdfReader(file_stream)
-                for page in reader.pages:
-                    text += page.extract_text() or ""
-                extraction_method = "PyPDF2"
-            except Exception as e:
-                print(f"⚠️ PyPDF2 failed: {e}")
-
-        # Fallback: PyMuPDF
-        if not text.strip():
-            try:
-                import fitz  # PyMuPDF
-                file_stream.seek(0)
-                doc = fitz.open(stream=file_stream.read(), filetype="pdf")
-                for page in doc:
-                    text += page.get_text()
-                doc.close()
-                extraction_method = "PyMuPDF"
-            except Exception as e:
-                print(f"⚠️ PyMuPDF failed: {e}")
-
-        if not text.strip():
+        text, extraction_method, _ = PdfExtractor().extract(file_stream)
+        if not text:
             return {'status': 'error', 'error': 'Unable to extract text from PDF.'}
-
-        from unidecode import unidecode
-        text = unidecode(text)
-
-        parsed_data = parse_resume_text(text)
-        parsed_data['extraction_method'] = extraction_method
-        parsed_data['text_preview'] = text[:500] + '...' if len(text) > 500 else text
-        parsed_data['total_text_length'] = len(text)
-
-        return parsed_data
+        return process_text(text, extraction_method)
 
     except Exception as e:
         return {'status': 'error', 'error': f'PDF processing failed: {str(e)}'}
 
+def process_text(text, extraction_method):
+    parsed_data = parse_resume_text(text)
+    parsed_data['extraction_method'] = extraction_method
+    parsed_data['text_preview'] = text[:500] + '...' if len(text) > 500 else text
+    parsed_data['total_text_length'] = len(text)
+    return parsed_data
+
 # -----------------------------
 # Resume Parsing Logic
 # -----------------------------
 
 def parse_resume_text(text):
     try:
+        # Line-local extractors run per section and are cached by section
+        # hash, so a revised resume only re-extracts the sections that changed.
+        # The rest match across section boundaries and run on the full text.
+        segments = split_sections(text)
+        taxonomy = get_taxonomy().fingerprint
+        email = next((e for e in map_segments('email', extract_email, segments) if e != "Email not found"), None)
+        work_entries = sum(map_segments('work_experience', count_work_experience, segments))
         return {
             'status': 'success',
             'name': extract_name(text),
-            'email': extract_email(text),
-            'phone': extract_phone(text),
-            'skills': extract_skills(text),
-            'education': extract_education(text),
-            'work_experience': extract_work_experience(text),
+            'email': email or "Email not found",
+            'phone': first_phone(map_segments('phone', phone_candidates, segments)),
+            'skills': list(set().union(*map_segments(f'skills@{taxonomy}', lambda seg: tuple(extract_skills(seg)), segments))),
+            'education': [dict(edu) for seg in map_segments('education', lambda seg: tuple(extract_education(seg)), segments) for edu in seg],
+            'work_experience': format_work_experience(work_entries),
             'sections': extract_sections(text),
             'summary': extract_summary(text),
-            'certifications': extract_certifications(text),
+            'certifications': [c for seg in map_segments(f'certifications@{taxonomy}', lambda seg: tuple(extract_certifications(seg)), segments) for c in seg],
             'projects': extract_projects(text)
         }
     except Exception as e:
@@ -104,36 +91,37 @@ def extract_email(text):
     emails = re.findall(email_pattern, text)
     return emails[0] if emails else "Email not found"
 
+PHONE_PATTERNS = [
+    r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',
+    r'\(\d{3}\)\s*\d{3}[-.]?\d{4}',
+    r'\+\d{1,3}[-.\s]?\d{1,4}[-.\s]?\d{1,4}[-.\s]?\d{1,9}'
+]
+
 def extract_phone(text):
-    phone_patterns = [
-        r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b',
-        r'\(\d{3}\)\s*\d{3}[-.]?\d{4}',
-        r'\+\d{1,3}[-.\s]?\d{1,4}[-.\s]?\d{1,4}[-.\s]?\d{1,9}'
-    ]
-    for pattern in phone_patterns:
+    return first_phone([phone_candidates(text)])
+
+def phone_candidates(text):
+    """First match of each phone pattern in the text (None where no match)."""
+    candidates = []
+    for pattern in PHONE_PATTERNS:
         phones = re.findall(pattern, text)
-        if phones:
-            return phones[0]
+        candidates.append(phones[0] if phones else None)
+    return tuple(candidates)
+
+def first_phone(segment_candidates):
+    # Earlier patterns win over later ones, then document order
+    for i in range(len(PHONE_PATTERNS)):
+        for candidates in segment_candidates:
+            if candidates[i]:
+                return candidates[i]
     return "Phone not found"
 
 def extract_skills(text):
-    tech_skills = [
-        'python', 'java', 'javascript', 'react', 'node.js', 'html', 'css',
-        'sql', 'mongodb', 'postgresql', 'git', 'docker', 'kubernetes',
-        'aws', 'azure', 'gcp', 'machine learning', 'data science',
-        'angular', 'vue.js', 'spring', 'django', 'flask', 'express'
-    ]
-    soft_skills = [
-        'communication', 'teamwork', 'leadership', 'problem-solving',
-        'adaptability', 'time management', 'critical thinking',
-        'project management', 'analytical thinking'
-    ]
-    all_skills = tech_skills + soft_skills
     found = []
     text_lower = text.lower()
-    for skill in all_skills:
+    for skill, title in get_taxonomy().skills:
         if skill in text_lower:
-            found.append(skill.title())
+            found.append(title)
     return list(set(found))
 
 def extract_education(text):
@@ -154,10 +142,15 @@ def extract_education(text):
     return education
 
 def extract_work_experience(text):
+    return format_work_experience(count_work_experience(text))
+
+def count_work_experience(text):
     year_pattern = r'(\d{4})\s*[-–]\s*(\d{4}|present|current)'
-    experiences = re.findall(year_pattern, text, re.IGNORECASE)
-    if experiences:
-        return f"Found {len(experiences)} work experience entries"
+    return len(re.findall(year_pattern, text, re.IGNORECASE))
+
+def format_work_experience(count):
+    if count:
+        return f"Found {count} work experience entries"
     return "No work experience found"
 
 def extract_sections(text):
@@ -190,7 +183,7 @@ def extract_summary(text):
     return "No summary available"
 
 def extract_certifications(text):
-    cert_keywords = ['certified', 'certification', 'certificate', 'aws', 'azure', 'google cloud']
+    cert_keywords = get_taxonomy().cert_keywords
     certifications = []
     lines = text.split('\n')
     for line in lines:
@@ -235,6 +228,19 @@ def health_check():
         'service': 'resume-analyzer'
     })
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return jsonify({
+        'status': 'success',
+        'timestamp': datetime.now().isoformat(),
+        'llm_scheduler': llm_scheduler.stats(),
+        'section_cache': section_cache.stats(),
+        'guidance_cache': guidance_cache_stats(),
+        'overload': overload_controller.stats(),
+        'uploads': upload_budget.stats(),
+        'prefetch': prefetcher.stats()
+    })
+
 @app.route('/industry-trends', methods=['POST'])
 def industry_trends():
     try:
@@ -258,55 +264,252 @@ def interview_questions():
     except Exception as e:
         return jsonify({'status': 'error', 'error': str(e)})
 
-@app.route('/analyze-resume', methods=['POST'])
-def analyze_resume():
+# -----------------------------
+# Resume / Job Matching
+# -----------------------------
+
+def document_id(file_stream):
+    """Stable id for an uploaded document: a short hash of its bytes."""
+    with upload_buffer(file_stream) as data:
+        digest = hashlib.sha256(data).hexdigest()[:16]
+    file_stream.seek(0)
+    return digest
+
+def document_size(file_stream):
+    file_stream.seek(0, os.SEEK_END)
+    size = file_stream.tell()
+    file_stream.seek(0)
+    return size
+
+def index_for_matching(resume_id, text, result, filename=None):
     try:
-        print("🔍 Starting resume analysis...")
+        resume_index.add(resume_id, text, result.get('skills', []), meta={
+            'name': result.get('name'),
+            'email': result.get('email'),
+            'filename': filename
+        })
+    except Exception as e:
+        print(f"⚠️ Indexing for matching failed: {e}")
+
+def record_result(resume_id, text, signature, result, filename=None, duplicate=None):
+    """
+    Index a successful analysis for matching and near-duplicate lookups, and
+    start prefetching the follow-up generations.
+    """
+    if duplicate and duplicate[0] != resume_id:
+        duplicate_id, similarity, _ = duplicate
+        result['duplicate_of'] = {'resume_id': duplicate_id, 'similarity': similarity, 'reused': False}
+    index_for_matching(resume_id, text, result, filename)
+    # The client usually asks for trends and interview questions next
+    prefetch_follow_ups(result.get('skills', []), rank_careers(result.get('skills', [])))
+    duplicate_index.add(resume_id, signature, result)
+
+@app.route('/match', methods=['POST'])
+def match_resumes():
+    """
+    Rank resumes against a job description.
+
+    Accepts JSON ({'job_description', 'top_k'}) to rank every resume analysed
+    so far, or a multipart form with 'job_description' and one or more
+    'resumes' files (PDF, DOCX or TXT) to rank just the uploaded ones.
+    """
+    try:
+        data = request.get_json(silent=True) or request.form
+        job_description = (data.get('job_description') or '').strip()
+        if not job_description:
+            return jsonify({'status': 'error', 'error': 'job_description is required'}), 400
 
-        if 'resume' not in request.files:
-            return jsonify({'error': 'No file uploaded'}), 400
+        try:
+            top_k = int(data.get('top_k', 10))
+        except (TypeError, ValueError):
+            return jsonify({'status': 'error', 'error': 'top_k must be an integer'}), 400
+
+        uploads = request.files.getlist('resumes')
+        if uploads:
+            matcher = ResumeMatcher()
+            skipped = []
+            for upload in uploads:
+                if not is_supported(upload.filename):
+                    skipped.append(upload.filename)
+                    continue
+                text = extract_document_text(upload.stream, upload.filename).text
+                if not text:
+                    skipped.append(upload.filename)
+                    continue
+                matcher.add(document_id(upload.stream), text, extract_skills(text), meta={
+                    'name': extract_name(text),
+                    'filename': upload.filename
+                })
+            source = 'uploaded'
+        else:
+            matcher = resume_index
+            skipped = []
+            source = 'indexed'
 
-        file = request.files['resume']
-        if file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
+        matches = matcher.rank(job_description, skills=extract_skills(job_description), top_k=top_k)
+        return jsonify({
+            'status': 'success',
+            'source': source,
+            'candidates_considered': len(matcher),
+            'matches': matches,
+            'skipped': skipped
+        })
+    except Exception as e:
+        return jsonify({'status': 'error', 'error': str(e)}), 500
 
-        if not file.filename.lower().endswith('.pdf'):
-            return jsonify({'error': 'Please upload a PDF file'}), 400
+# -----------------------------
+# Analysis Pipeline
+# -----------------------------
 
-        # ✅ Try Affinda first
-        print("📡 Attempting Affinda parsing...")
+# Concurrent uploads of the same document share one analysis
+analysis_flight = SingleFlight()
+
+def career_advice(result):
+    """
+    LLM career guidance, or local rule-based advice while the LLM is
+    overloaded so that parsing keeps its latency. Degraded responses are
+    marked; in 'defer' mode the real advice is generated in the background
+    and cached for the candidate's next request.
+    """
+    reason = overload_controller.should_degrade()
+    if not reason:
+        return career_guidance_agent(result)
+
+    # Advice deferred during an earlier request is served as soon as it exists
+    cached = cached_career_guidance(result)
+    if cached is not None:
+        return cached
+
+    print(f"🪫 Degraded advice ({reason})")
+    result['degraded'] = True
+    result['degraded_reason'] = reason
+    if OVERLOAD_MODE == 'defer':
+        snapshot = {k: result.get(k) for k in ('name', 'email', 'skills', 'summary', 'work_experience',
+                                               'education', 'certifications', 'projects') if k in result}
+        result['advice_deferred'] = overload_controller.defer(
+            career_guidance_agent, snapshot, priority=Priority.BACKGROUND
+        )
+    # Best-matching roles first; career_suggestions is sorted by name
+    return rule_based_career_advice(result, rank_careers(result.get('skills', [])))
+
+def run_analysis(file_stream, filename, resume_id):
+    """
+    Full analysis of one uploaded document: duplicate check, Affinda with
+    local fallback, career suggestions and AI advice. Returns the response dict.
+    """
+    # Local text is needed for duplicate detection and reused by the fallbacks.
+    # Scanned documents come back empty here: Affinda reads them itself, so
+    # OCR only runs once Affinda has failed.
+    with stage('extract_text'):
         try:
-            affinda_result = Affinda.parse_resume(file.stream, file.filename)
-            if affinda_result['status'] == 'success':
+            text, extraction_method, pages = extract_document_text(file_stream, filename, ocr=False)
+        except Exception as e:
+            print(f"⚠️ Local text extraction failed: {e}")
+            text, extraction_method, pages = "", None, None
+    set_fingerprint(pages=pages, text_chars=len(text), extraction_method=extraction_method)
+
+    with stage('duplicate_check'):
+        signature = minhash_signature(text) if DUPLICATE_POLICY != 'off' else None
+        duplicate = duplicate_index.find(signature)
+    if duplicate:
+        duplicate_id, similarity, previous_result = duplicate
+        print(f"♻️ Near-duplicate of {duplicate_id} (similarity {similarity:.2f})")
+        if DUPLICATE_POLICY == 'reuse' and duplicate_id != resume_id:
+            reused = dict(previous_result)
+            reused['resume_id'] = resume_id
+            reused['duplicate_of'] = {'resume_id': duplicate_id, 'similarity': similarity, 'reused': True}
+            return reused
+        if DUPLICATE_POLICY == 'reuse':
+            return previous_result
+
+    # ✅ Try Affinda first
+    print("📡 Attempting Affinda parsing...")
+    try:
+        with stage('affinda'):
+            affinda_result = Affinda.parse_resume(file_stream, filename, text=text)
+        if affinda_result['status'] == 'success':
+            with stage('career_suggestions'):
                 affinda_result['career_suggestions'] = suggest_careers({
                     'skills': affinda_result.get('skills', [])
                 })
-                print("🧠 Generating AI career advice with Gemini...")
-                affinda_result["ai_agent_career_advice"] = career_guidance_agent(affinda_result)
-                affinda_result['source'] = 'affinda'
-                return jsonify(affinda_result)
-            else:
-                print(f"❌ Affinda failed: {affinda_result.get('error', 'Unknown error')}")
-        except Exception as e:
-            print(f"❌ Affinda exception: {str(e)}")
-
-        print("⚠️ Affinda failed. Using enhanced fallback...")
-        file.stream.seek(0)
-        fallback_result = process_pdf_in_memory(file.stream)
+            print("🧠 Generating AI career advice with Gemini...")
+            with stage('career_advice'):
+                affinda_result["ai_agent_career_advice"] = career_advice(affinda_result)
+            affinda_result['source'] = 'affinda'
+            affinda_result['resume_id'] = resume_id
+            raw_text = text or (affinda_result.get('affinda_raw') or {}).get('rawText') or affinda_result.get('summary', '')
+            if signature is None and DUPLICATE_POLICY != 'off':
+                signature = minhash_signature(raw_text)
+            with stage('indexing'):
+                record_result(resume_id, raw_text, signature, affinda_result, filename, duplicate)
+            return affinda_result
+        else:
+            print(f"❌ Affinda failed: {affinda_result.get('error', 'Unknown error')}")
+    except Exception as e:
+        print(f"❌ Affinda exception: {str(e)}")
 
-        if fallback_result['status'] == 'success':
-            fallback_result['source'] = 'fallback'
-            fallback_result['note'] = 'Processed using local parser (Affinda unavailable)'
+    print("⚠️ Affinda failed. Using enhanced fallback...")
+    if not text:
+        with stage('ocr'):
+            try:
+                text, extraction_method, _ = ocr_document_text(file_stream, filename)
+            except Exception as e:
+                print(f"⚠️ OCR failed: {e}")
+        set_fingerprint(text_chars=len(text), extraction_method=extraction_method)
+        if DUPLICATE_POLICY != 'off':
+            signature = minhash_signature(text)
+    if text:
+        with stage('local_parse'):
+            fallback_result = process_text(text, extraction_method)
+    else:
+        fallback_result = {'status': 'error', 'error': 'Unable to extract text from document.'}
+
+    if fallback_result['status'] == 'success':
+        fallback_result['source'] = 'fallback'
+        fallback_result['resume_id'] = resume_id
+        fallback_result['note'] = 'Processed using local parser (Affinda unavailable)'
+        with stage('career_suggestions'):
             fallback_result['career_suggestions'] = suggest_careers({
                 'skills': fallback_result.get('skills', [])
             })
-            print("🧠 Generating AI career advice with Gemini...")
-            fallback_result["ai_agent_career_advice"] = career_guidance_agent(fallback_result)
-            print("✅ Fallback parsing successful with AI agent advice")
-        else:
-            print(f"❌ Fallback failed: {fallback_result.get('error')}")
+        print("🧠 Generating AI career advice with Gemini...")
+        with stage('career_advice'):
+            fallback_result["ai_agent_career_advice"] = career_advice(fallback_result)
+        with stage('indexing'):
+            record_result(resume_id, text, signature, fallback_result, filename, duplicate)
+        print("✅ Fallback parsing successful with AI agent advice")
+    else:
+        print(f"❌ Fallback failed: {fallback_result.get('error')}")
 
-        return jsonify(fallback_result)
+    return fallback_result
+
+@app.route('/analyze-resume', methods=['POST'])
+def analyze_resume():
+    try:
+        print("🔍 Starting resume analysis...")
+
+        if 'resume' not in request.files:
+            return jsonify({'error': 'No file uploaded'}), 400
+
+        file = request.files['resume']
+        if file.filename == '':
+            return jsonify({'error': 'No file selected'}), 400
+
+        if not is_supported(file.filename):
+            return jsonify({'error': f'Unsupported file format. Please upload: {", ".join(SUPPORTED_EXTENSIONS)}'}), 400
+
+        resume_id = document_id(file.stream)
+        extension = os.path.splitext(file.filename)[1].lower()
+        # Only hashes and sizes, never the filename or content
+        set_fingerprint(document_hash=resume_id, extension=extension, size_bytes=document_size(file.stream))
+
+        # Identical uploads arriving together wait on the first one's analysis
+        result, shared = analysis_flight.do(
+            (resume_id, extension), run_analysis, file.stream, file.filename, resume_id
+        )
+        if shared:
+            print(f"🔗 Joined in-flight analysis of {resume_id}")
+        return jsonify(project_fields(result, request.args.get('fields')))
 
     except Exception as e:
         print(f"💥 Critical exception: {str(e)}")
@@ -316,5 +519,32 @@ def analyze_resume():
             'status': 'error'
         }), 500
 
+# -----------------------------
+# Admin: captured profiles
+# -----------------------------
+
+@app.route('/admin/profiles', methods=['GET'])
+def admin_profiles():
+    if not admin_authorized(request):
+        return jsonify({'status': 'error', 'error': 'Not found'}), 404
+    return jsonify({'status': 'success', 'profiles': list_profiles()})
+
+@app.route('/admin/profiles/<int:profile_id>', methods=['GET'])
+def admin_profile(profile_id):
+    """
+    One captured profile. ?format=folded returns the sampled stacks as plain
+    text for flamegraph.pl or speedscope; the default is JSON with the stage
+    breakdown and fingerprint.
+    """
+    if not admin_authorized(request):
+        return jsonify({'status': 'error', 'error': 'Not found'}), 404
+    profile = get_profile(profile_id)
+    if profile is None:
+        return jsonify({'status': 'error', 'error': 'Profile not found'}), 404
+    if request.args.get('format') == 'folded':
+        return app.response_class(profile.folded() + '\n', mimetype='text/plain')
+    return jsonify({'status': 'success', 'profile': profile.summary(), 'folded_stacks': profile.folded()})
+
 if __name__ == '__main__':
-    app.run(debug=True, port=5000, host='0.0.0.0')
+    # Development server only; see wsgi.py / gunicorn.conf.py for production
+    app.run(debug=os.getenv('FLASK_DEBUG', 'true').lower() == 'true', port=5000, host='0.0.0.0')
@@ -0,0 +1,38 @@
+import os
+
+from gunicorn_settings import BIND, THREADS, TIMEOUT, WORKER_CLASS, WORKER_CONNECTIONS, WORKERS
+
+# Process-wide budgets (LLM rate and concurrency, extraction pool size) are
+# totals for the server; each worker takes its share of them
+os.environ["SERVER_WORKERS"] = str(WORKERS)
+
+if WORKER_CLASS == "gevent":
+    # Patch in the master before the app is preloaded, so module-level locks
+    # and clients are created cooperative
+    from gevent import monkey
+    monkey.patch_all()
+
+bind = BIND
+worker_class = WORKER_CLASS
+workers = WORKERS
+threads = THREADS
+worker_connections = WORKER_CONNECTIONS
+timeout = TIMEOUT
+graceful_timeout = 30
+keepalive = 5
+
+# Import the app, clients and parsing libraries once before forking
+preload_app = True
+
+accesslog = "-"
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    # Give each worker its own HTTP connection pool for Cohere
+    try:
+        import cohere
+        from utility import ai_agent
+        ai_agent.co = cohere.Client(ai_agent.COHERE_API_KEY)
+    except Exception as e:
+        server.log.warning(f"Cohere client not re-created after fork: {e}")
@@ -0,0 +1,18 @@
+import multiprocessing
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# gevent:  cooperative greenlets; waiting on Affinda/Cohere yields instead of
+#          holding a thread, so one worker carries hundreds of requests.
+# gthread: a thread per in-flight request, blocking I/O holds its thread;
+#          handlers mostly wait on Affinda/Cohere, so size THREADS for that.
+WORKER_CLASS = os.getenv("WORKER_CLASS", "gevent")
+WORKERS = int(os.getenv("WEB_CONCURRENCY", "0")) or multiprocessing.cpu_count() * 2 + 1
+THREADS = int(os.getenv("THREADS", "32"))
+WORKER_CONNECTIONS = int(os.getenv("WORKER_CONNECTIONS", "500"))
+BIND = os.getenv("BIND", "0.0.0.0:5000")
+# Affinda plus a 600-token generation can take a while
+TIMEOUT = int(os.getenv("WORKER_TIMEOUT", "120"))
@@ -0,0 +1,81 @@
+"""
+Small concurrency load test for the API.
+
+Start a server, then for example:
+
+    python loadtest.py --url http://localhost:5000/analyze-resume --file ../dummy.pdf -c 32 -n 200
+
+Run it once against the dev server (python app_memory.py) and once against
+gunicorn (gunicorn -c gunicorn.conf.py wsgi:app) to compare throughput and
+tail latency at the same concurrency.
+
+Repeated uploads of one file are mostly answered by single-flight and the
+result caches; pass a directory as --file to cycle through distinct resumes.
+"""
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def _one_request(url, file_path, fields):
+    started = time.perf_counter()
+    try:
+        if file_path:
+            with open(file_path, "rb") as f:
+                files = {"resume": (os.path.basename(file_path), f)}
+                response = requests.post(url, files=files, params={"fields": fields} if fields else None, timeout=300)
+        else:
+            response = requests.get(url, timeout=300)
+        ok = response.status_code < 500
+    except requests.RequestException:
+        ok = False
+    return ok, time.perf_counter() - started
+
+
+def _upload_files(file_path):
+    if not file_path or not os.path.isdir(file_path):
+        return [file_path]
+    return sorted(os.path.join(file_path, name) for name in os.listdir(file_path)
+                  if os.path.isfile(os.path.join(file_path, name)))
+
+
+def run(url, file_path, concurrency, total, fields=None):
+    files = _upload_files(file_path)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda i: _one_request(url, files[i % len(files)], fields), range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for _, latency in results)
+    failures = sum(1 for ok, _ in results if not ok)
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "failures": failures,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(total / elapsed, 2),
+        "latency_p50_s": round(statistics.median(latencies), 3),
+        "latency_p95_s": round(percentile(0.95), 3),
+        "latency_max_s": round(latencies[-1], 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:5000/analyze-resume")
+    parser.add_argument("--file", help="resume to upload, or a directory of them; omit to send GET requests")
+    parser.add_argument("--fields", help="value for ?fields=")
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("-n", "--requests", type=int, default=100)
+    args = parser.parse_args()
+
+    for key, value in run(args.url, args.file, args.concurrency, args.requests, args.fields).items():
+        print(f"{key:>16}: {value}")
@@ -0,0 +1,51 @@
+import random
+
+from utility.matcher import ResumeMatcher
+
+
+def _ranking(matcher, query, skills=None):
+    return sorted((-r['score'], r['resume_id']) for r in matcher.rank(query, skills=skills, top_k=1000))
+
+
+def test_document_without_tokens_alone():
+    matcher = ResumeMatcher()
+    assert matcher.add("a", "-----")
+    assert matcher.rank("python dev") == []
+    assert len(matcher) == 1
+
+
+def test_document_without_tokens_keeps_rows_aligned():
+    matcher = ResumeMatcher()
+    matcher.add("a", "python java")
+    matcher.rank("python")
+    matcher.add("b", "!!!")
+    matcher.add("c", "python go")
+
+    ranked = [r['resume_id'] for r in matcher.rank("python go")]
+    assert ranked == ["c", "a"]
+
+
+def test_capped_index_ranks_like_a_fresh_one():
+    rng = random.Random(3)
+    words = [f"w{i}" for i in range(200)]
+    docs = []
+    for i in range(600):
+        # Every 11th resume has nothing to index
+        text = "---" if i % 11 == 0 else " ".join(rng.choices(words, k=40))
+        docs.append((f"d{i}", text, ["python"] if i % 5 == 0 else []))
+
+    capped = ResumeMatcher(max_docs=100)
+    for i, (doc_id, text, skills) in enumerate(docs):
+        capped.add(doc_id, text, skills)
+        if i % 37 == 0:
+            capped.rank("w1 w2", skills=["python"])
+    assert len(capped) == 100
+    assert len(capped._doc_ids) <= 2 * 100 + 1
+
+    fresh = ResumeMatcher()
+    for doc_id, text, skills in docs[-100:]:
+        fresh.add(doc_id, text, skills)
+
+    for query in ("w1 w2 w3", "w7 w150", "w199"):
+        assert _ranking(capped, query, ["python"]) == _ranking(fresh, query, ["python"])
+    assert "d0" not in capped and "d599" in capped
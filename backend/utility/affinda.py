@@ -1,9 +1,11 @@
 import os
+import mimetypes
 import requests
 import json
 from dotenv import load_dotenv
 from pdfminer.high_level import extract_text
 from unidecode import unidecode
+from utility.extractors import extract_document_text
 
 # Load API key from .env file
 load_dotenv()
@@ -15,7 +17,11 @@ class Affinda:
     TEXT_PARSE_URL = "https://api.affinda.com/v2/resume_parsing_requests"
 
     @staticmethod
-    def parse_resume(file_stream, filename="resume.pdf"):
+    def parse_resume(file_stream, filename="resume.pdf", text=None):
+        """
+        Parse the uploaded file. `text` is the caller's local extraction of it,
+        reused by the text fallback instead of extracting the document again.
+        """
         if not AFFINDA_API_KEY:
             return {
                 "status": "error",
@@ -31,8 +37,9 @@ class Affinda:
                 "Authorization": f"Bearer {AFFINDA_API_KEY}",
             }
 
+            content_type = mimetypes.guess_type(filename)[0] or 'application/pdf'
             files = {
-                'file': (filename, file_stream, 'application/pdf')
+                'file': (filename, file_stream, content_type)
             }
 
             response = requests.post(Affinda.FILE_UPLOAD_URL, headers=headers, files=files)
@@ -40,7 +47,7 @@ class Affinda:
             # If file upload fails, try fallback method
             if response.status_code not in [200, 201]:
                 print(f"⚠️ File upload failed ({response.status_code}), trying text fallback...")
-                return Affinda._parse_with_text_fallback(file_stream)
+                return Affinda._parse_with_text_fallback(file_stream, filename, text)
 
             return Affinda._process_response(response)
 
@@ -52,15 +59,12 @@ class Affinda:
             }
 
     @staticmethod
-    def _parse_with_text_fallback(file_stream):
-        """Fallback method using extracted text instead of PDF file"""
+    def _parse_with_text_fallback(file_stream, filename="resume.pdf", text=None):
+        """Fallback method using extracted text instead of the uploaded file"""
         try:
-            # Extract text from PDF using pdfminer
-            file_stream.seek(0)
-            raw_text = extract_text(file_stream)
-
-            # Clean Unicode issues
-            clean_text = unidecode(raw_text)
+            # Extract text with the format-specific extractor unless the caller
+            # already did; the result is already cleaned of Unicode issues
+            clean_text = text if text is not None else extract_document_text(file_stream, filename).text
 
             if not clean_text.strip():
                 return {
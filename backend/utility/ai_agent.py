@@ -1,6 +1,14 @@
 import os
+import time
+import hashlib
 import cohere
 from dotenv import load_dotenv
+from utility.llm_scheduler import Priority, llm_scheduler
+from utility.singleflight import SingleFlight
+from utility.cache import LRUCache
+from utility.overload import overload_controller
+from utility.prefetch import PREFETCH_ENABLED, PREFETCH_TOP_ROLES, prefetcher
+from utility.taxonomy import get_taxonomy
 
 # Load environment variables
 load_dotenv()
@@ -9,6 +17,54 @@ COHERE_API_KEY = os.getenv("COHERE_API_KEY")
 # Initialize Cohere client
 co = cohere.Client(COHERE_API_KEY)
 
+# Identical generations requested concurrently share one Cohere call
+_generations = SingleFlight()
+# Scheduler ticket of each generation in flight, by single-flight key
+_tickets = {}
+
+# Successful career guidance by guidance_key(), reused across resume revisions
+_guidance_cache = LRUCache(int(os.getenv("GUIDANCE_CACHE_SIZE", "5000")))
+
+
+def normalize_skills(skills: list) -> tuple:
+    """Order- and case-insensitive form of a skill list, used in coalescing keys."""
+    return tuple(sorted({s.strip().lower() for s in skills or [] if isinstance(s, str) and s.strip()}))
+
+
+def generate_text(prompt: str, max_tokens: int, priority: Priority = Priority.INTERACTIVE, key=None) -> str:
+    """
+    Run one Cohere generation through the process-wide LLM scheduler, which
+    enforces the rate limit and concurrency cap and orders callers by priority.
+
+    Concurrent calls with the same key (the prompt itself by default) wait on a
+    single generation; an error is raised to every one of them. A caller
+    joining a generation still queued at a lower priority (a prefetch, say)
+    moves it up to its own priority.
+    """
+    flight_key = (max_tokens, key if key is not None else prompt)
+
+    def _generate():
+        ticket = _tickets[flight_key] = {}
+        try:
+            with llm_scheduler.slot(priority, ticket=ticket):
+                started = time.monotonic()
+                response = co.generate(
+                    model="command-r-plus",
+                    prompt=prompt,
+                    max_tokens=max_tokens,
+                    temperature=0.7
+                )
+                overload_controller.record_latency(time.monotonic() - started)
+        finally:
+            _tickets.pop(flight_key, None)
+        return response.generations[0].text
+
+    ticket = _tickets.get(flight_key)
+    if ticket is not None:
+        llm_scheduler.promote(ticket, priority)
+    text, _ = _generations.do(flight_key, _generate)
+    return text
+
 
 def format_with_headings(text: str, title: str = "") -> str:
     """
@@ -25,10 +81,52 @@ def format_with_headings(text: str, title: str = "") -> str:
     return text.strip()
 
 
-def career_guidance_agent(parsed_resume: dict) -> str:
+# Placeholders the parsers return when a field is missing
+_NOT_FOUND = {'not found', 'name not found', 'email not found', 'phone not found'}
+
+
+def _identity(value) -> str:
+    value = str(value or '').strip().lower()
+    return '' if value in _NOT_FOUND else value
+
+
+def guidance_key(parsed_resume: dict) -> str:
+    """
+    Cache key for career guidance: the candidate plus the inputs that
+    materially change the advice (skills, summary, experience). Revisions that
+    only touch other sections map to the same key and reuse the advice.
+    """
+    summary = ' '.join(str(parsed_resume.get('summary') or '').split())
+    experience = ' '.join(str(parsed_resume.get('work_experience') or '').split())
+    material = repr((
+        # Both, since the prompt is personalised by name
+        _identity(parsed_resume.get('name')),
+        _identity(parsed_resume.get('email')),
+        normalize_skills(parsed_resume.get('skills', [])),
+        summary,
+        experience
+    ))
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+
+def cached_career_guidance(parsed_resume: dict):
+    """Previously generated guidance for this candidate and material, or None."""
+    return _guidance_cache.get(guidance_key(parsed_resume))
+
+
+def guidance_cache_stats() -> dict:
+    return _guidance_cache.stats()
+
+
+def career_guidance_agent(parsed_resume: dict, priority: Priority = Priority.INTERACTIVE) -> str:
     """
     Generate formal, markdown-formatted career guidance using Cohere AI.
     """
+    key = guidance_key(parsed_resume)
+    cached = _guidance_cache.get(key)
+    if cached is not None:
+        return cached
+
     try:
         name = parsed_resume.get('name', 'Candidate')
         skills = parsed_resume.get('skills', [])
@@ -67,14 +165,11 @@ Now provide:
 6. One Personalized Tip
 """
 
-        response = co.generate(
-            model="command-r-plus",
-            prompt=prompt,
-            max_tokens=600,
-            temperature=0.7
-        )
+        text = generate_text(prompt, max_tokens=600, priority=priority)
 
-        return format_with_headings(response.generations[0].text, title="Career Guidance")
+        advice = format_with_headings(text, title="Career Guidance")
+        _guidance_cache.put(key, advice)
+        return advice
 
     except Exception as e:
         return f"""**Career Guidance Unavailable**
@@ -89,14 +184,67 @@ Now provide:
 """
 
 
-def get_industry_trends(skills: list) -> str:
+def rule_based_career_advice(parsed_resume: dict, career_suggestions: list) -> str:
     """
-    Generate formal industry trends with markdown-style formatting using Cohere AI.
+    Local, LLM-free career guidance built from the suggested roles (best
+    match first; the first three are named) and the taxonomy, used when the
+    LLM is overloaded. Same headings as
+    career_guidance_agent so clients render it the same way.
     """
-    try:
-        skills_text = ', '.join(skills) if skills else "general technology skills"
+    taxonomy = get_taxonomy()
+    skills = [s for s in parsed_resume.get('skills', []) if isinstance(s, str)]
+    have = {s.lower() for s in skills}
+    roles = [r for r in career_suggestions or [] if r in taxonomy.role_names][:3]
+
+    missing = []
+    for role in roles:
+        for keyword in taxonomy.role_keywords(role):
+            if keyword not in have and keyword not in missing:
+                missing.append(keyword)
+    soft_gaps = [s for s in taxonomy.soft_skills if s not in have][:2]
+
+    role_lines = '\n'.join(f"- {role}" for role in roles) or "- Explore roles that match your strongest skills"
+    skill_lines = '\n'.join(f"- {k.title()}" for k in missing[:3]) or "- Deepen your existing stack with an advanced project"
+    soft_lines = '\n'.join(f"- {s.title()}" for s in soft_gaps) or "- Mentoring and presenting your work"
+    focus = ', '.join(k.title() for k in missing[:3]) or "your core skills"
+    target = roles[0] if roles else "your target role"
+
+    text = f"""1. Career Path Suggestions
+{role_lines}
+
+2. Technical Skills to Focus On
+{skill_lines}
+
+3. Soft Skills to Build
+{soft_lines}
+
+4. A 30-Day Action Plan
+- Week 1: Review job postings for {target} and list the recurring requirements
+- Week 2: Learn the basics of {focus}
+- Week 3: Build a small portfolio project that uses them
+- Week 4: Update your resume and LinkedIn, then apply to 5-10 roles
+
+5. Industry Market Insight
+Employers hiring for {target} increasingly screen for hands-on project evidence alongside listed skills.
+
+6. One Personalized Tip
+Lead your resume with measurable results from projects using {', '.join(skills[:3]) or 'your strongest skills'}."""
+
+    return format_with_headings(text, title="Career Guidance")
 
-        prompt = f"""
+
+def industry_trends_key(skills: list) -> tuple:
+    return ("industry_trends", normalize_skills(skills))
+
+
+def interview_questions_key(role: str, skills: list) -> tuple:
+    return ("interview_questions", (role or "Software Engineer").strip().lower(), normalize_skills(skills))
+
+
+def _industry_trends(skills: list, priority: Priority) -> str:
+    skills_text = ', '.join(skills) if skills else "general technology skills"
+
+    prompt = f"""
 Analyze the following skills: {skills_text}
 
 Provide:
@@ -108,14 +256,20 @@ Provide:
 Be concise, professional, and markdown-friendly.
 """
 
-        response = co.generate(
-            model="command-r-plus",
-            prompt=prompt,
-            max_tokens=400,
-            temperature=0.7
-        )
+    text = generate_text(prompt, max_tokens=400, priority=priority, key=industry_trends_key(skills))
+    return format_with_headings(text, title="Industry Trends")
 
-        return format_with_headings(response.generations[0].text, title="Industry Trends")
+
+def get_industry_trends(skills: list, priority: Priority = Priority.INTERACTIVE) -> str:
+    """
+    Generate formal industry trends with markdown-style formatting using Cohere AI.
+    """
+    prefetched = prefetcher.take(industry_trends_key(skills))
+    if prefetched is not None:
+        return prefetched
+
+    try:
+        return _industry_trends(skills, priority)
 
     except Exception as e:
         return f"""**Industry Trends Unavailable**
@@ -126,15 +280,12 @@ Be concise, professional, and markdown-friendly.
 """
 
 
-def generate_interview_questions(role: str, skills: list) -> str:
-    """
-    Generate formal markdown-formatted interview questions for the role and skills.
-    """
-    try:
-        role = role or "Software Engineer"
-        skills_text = ', '.join(skills) if skills else "general skills"
+def _interview_questions(role: str, skills: list, priority: Priority) -> str:
+    key = interview_questions_key(role, skills)
+    role = role or "Software Engineer"
+    skills_text = ', '.join(skills) if skills else "general skills"
 
-        prompt = f"""
+    prompt = f"""
 You are an expert interviewer.
 
 Generate 8-10 questions for a {role} role with skills in: {skills_text}.
@@ -147,14 +298,20 @@ Include:
 Mention what each question is assessing.
 """
 
-        response = co.generate(
-            model="command-r-plus",
-            prompt=prompt,
-            max_tokens=500,
-            temperature=0.7
-        )
+    text = generate_text(prompt, max_tokens=500, priority=priority, key=key)
+    return format_with_headings(text, title="Interview Questions")
+
+
+def generate_interview_questions(role: str, skills: list, priority: Priority = Priority.INTERACTIVE) -> str:
+    """
+    Generate formal markdown-formatted interview questions for the role and skills.
+    """
+    prefetched = prefetcher.take(interview_questions_key(role, skills))
+    if prefetched is not None:
+        return prefetched
 
-        return format_with_headings(response.generations[0].text, title="Interview Questions")
+    try:
+        return _interview_questions(role, skills, priority)
 
     except Exception as e:
         return f"""**Interview Questions Unavailable**
@@ -163,3 +320,20 @@ Mention what each question is assessing.
 
 **Tip:** Visit job portals or use Glassdoor/Leetcode to find real-world interview questions for similar roles.
 """
+
+
+def prefetch_follow_ups(skills: list, roles: list) -> int:
+    """
+    Speculatively generate what the client usually asks for after an
+    analysis: industry trends for the skills and interview questions for
+    each of the given roles, at background priority. The endpoints pick the
+    results up through prefetcher.take(). Returns how many were scheduled.
+    """
+    if not PREFETCH_ENABLED or not skills:
+        return 0
+    scheduled = prefetcher.schedule(industry_trends_key(skills), _industry_trends, skills, Priority.BACKGROUND)
+    for role in roles[:PREFETCH_TOP_ROLES]:
+        scheduled += prefetcher.schedule(
+            interview_questions_key(role, skills), _interview_questions, role, skills, Priority.BACKGROUND
+        )
+    return scheduled
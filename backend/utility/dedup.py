@@ -0,0 +1,137 @@
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# off   - no duplicate detection
+# flag  - process normally, but mark the response as a near-duplicate
+# reuse - answer near-duplicates from the earlier result without reprocessing
+DUPLICATE_POLICY = os.getenv("DUPLICATE_POLICY", "flag").lower()
+DUPLICATE_THRESHOLD = float(os.getenv("DUPLICATE_THRESHOLD", "0.85"))
+DUPLICATE_CACHE_SIZE = int(os.getenv("DUPLICATE_CACHE_SIZE", "5000"))
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+# Fixed seed so signatures are comparable across workers and restarts
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(re.sub(r"[^a-z0-9@+#.]+", " ", (text or "").lower()).split())
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """
+    MinHash signature over word shingles of the normalized text.
+    Returns None if the text is empty.
+    """
+    words = normalize_text(text).split()
+    if not words:
+        return None
+
+    size = min(SHINGLE_SIZE, len(words))
+    shingles = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles)
+    )
+
+    # One row per permutation, one column per shingle, min over the shingles
+    permuted = (np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=1)
+
+
+def estimate_similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the two shingle sets."""
+    return float(np.count_nonzero(sig_a == sig_b)) / NUM_PERM
+
+
+class DuplicateIndex:
+    """
+    LSH index of MinHash signatures with the result computed for each document.
+
+    A signature is split into BANDS bands of ROWS values; documents sharing
+    any band are candidates, which are then confirmed against the threshold.
+    Lookups touch a handful of buckets instead of scanning every stored
+    document. The oldest entries are evicted once max_size is reached.
+    """
+
+    def __init__(self, threshold: float = DUPLICATE_THRESHOLD, max_size: int = DUPLICATE_CACHE_SIZE):
+        self.threshold = threshold
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._buckets = [{} for _ in range(BANDS)]
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    @staticmethod
+    def _band_keys(signature):
+        return [signature[i * ROWS:(i + 1) * ROWS].tobytes() for i in range(BANDS)]
+
+    def find(self, signature):
+        """
+        Return (doc_id, similarity, result) for the closest stored document
+        above the threshold, or None.
+        """
+        if signature is None:
+            return None
+
+        with self._lock:
+            candidates = set()
+            for band, key in zip(self._buckets, self._band_keys(signature)):
+                candidates.update(band.get(key, ()))
+
+            best = None
+            for doc_id in candidates:
+                stored_signature, result = self._entries[doc_id]
+                similarity = estimate_similarity(signature, stored_signature)
+                if similarity >= self.threshold and (best is None or similarity > best[1]):
+                    best = (doc_id, similarity, result)
+
+            if best:
+                self._entries.move_to_end(best[0])
+            return best
+
+    def add(self, doc_id, signature, result):
+        if signature is None:
+            return
+
+        with self._lock:
+            if doc_id in self._entries:
+                self._entries[doc_id] = (self._entries[doc_id][0], result)
+                self._entries.move_to_end(doc_id)
+                return
+
+            self._entries[doc_id] = (signature, result)
+            for band, key in zip(self._buckets, self._band_keys(signature)):
+                band.setdefault(key, set()).add(doc_id)
+
+            while len(self._entries) > self.max_size:
+                old_id, (old_signature, _) = self._entries.popitem(last=False)
+                for band, key in zip(self._buckets, self._band_keys(old_signature)):
+                    bucket = band.get(key)
+                    if bucket:
+                        bucket.discard(old_id)
+                        if not bucket:
+                            del band[key]
+
+
+# Process-wide index of analysed resumes
+duplicate_index = DuplicateIndex()
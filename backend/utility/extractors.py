@@ -0,0 +1,293 @@
+import codecs
+import io
+import os
+import zipfile
+from collections import namedtuple
+from xml.etree.ElementTree import iterparse
+
+from dotenv import load_dotenv
+from unidecode import unidecode
+
+from utility.ocr import ocr_pdf
+from utility.pools import WORKER_PROCESSES, get_process_pool, get_thread_pool
+from utility.uploads import upload_buffer, upload_path
+
+load_dotenv()
+
+# PDFs with at least this many pages are extracted in parallel page ranges
+PARALLEL_PDF_MIN_PAGES = int(os.getenv("PARALLEL_PDF_MIN_PAGES", "16"))
+PDF_PAGES_PER_CHUNK = int(os.getenv("PDF_PAGES_PER_CHUNK", "8"))
+# "pdfminer" (processes, same output as the serial path) or "pymupdf" (threads)
+PARALLEL_PDF_ENGINE = os.getenv("PARALLEL_PDF_ENGINE", "pdfminer").lower()
+
+# text is "" when nothing could be extracted; pages is None when unknown
+Extraction = namedtuple("Extraction", ["text", "method", "pages"])
+
+
+class UnsupportedFormatError(ValueError):
+    pass
+
+
+class TextExtractor:
+    """
+    Base class for format-specific extractors. Subclasses list the file
+    extensions they handle and implement _extract(file_stream, ocr); formats
+    that can be scanned also implement _ocr(file_stream).
+    """
+    extensions = ()
+
+    def extract(self, file_stream, ocr=True) -> Extraction:
+        """Text of the document; with ocr=False image-only documents come back empty."""
+        file_stream.seek(0)
+        return self._clean(*self._extract(file_stream, ocr))
+
+    def extract_ocr(self, file_stream) -> Extraction:
+        """Text recognized from the rendered pages, for documents extract(ocr=False) found empty."""
+        file_stream.seek(0)
+        return self._clean(*self._ocr(file_stream))
+
+    @staticmethod
+    def _clean(text, method, pages) -> Extraction:
+        if not text or not text.strip():
+            return Extraction("", method, pages)
+        return Extraction(unidecode(text), method, pages)
+
+    def _extract(self, file_stream, ocr):
+        raise NotImplementedError
+
+    def _ocr(self, file_stream):
+        return "", None, None
+
+
+def _open_pdf(source):
+    """PyMuPDF document from a file path or a bytes-like buffer."""
+    import fitz  # PyMuPDF
+    if isinstance(source, str):
+        return fitz.open(source, filetype="pdf")
+    return fitz.open(stream=source, filetype="pdf")
+
+
+def _pdfminer_pages(source, first, last):
+    """Runs in a pool worker: pdfminer text of pages [first, last) of a path or bytes."""
+    from pdfminer.high_level import extract_text
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            return extract_text(f, page_numbers=range(first, last))
+    return extract_text(io.BytesIO(source), page_numbers=range(first, last))
+
+
+def _pymupdf_pages(source, first, last):
+    """PyMuPDF text of pages [first, last); each call opens its own document."""
+    doc = _open_pdf(source)
+    try:
+        return "".join(doc[i].get_text() for i in range(first, last))
+    finally:
+        doc.close()
+
+
+def _count_pages(data):
+    try:
+        with _open_pdf(data) as doc:
+            return doc.page_count
+    except Exception:
+        import PyPDF2
+        return len(PyPDF2.PdfReader(io.BytesIO(data)).pages)
+
+
+class PdfExtractor(TextExtractor):
+    extensions = (".pdf",)
+
+    def _extract_parallel(self, file_stream, data, pages):
+        """
+        Split a long PDF into page ranges and extract them concurrently:
+        pdfminer in the process pool, PyMuPDF in threads. Chunks are
+        reassembled in page order. Returns (text, method), text "" on failure.
+        Pool workers open a spooled upload by path; in-memory ones are sent
+        as bytes.
+        """
+        chunk = max(1, min(PDF_PAGES_PER_CHUNK, -(-pages // WORKER_PROCESSES)))
+        ranges = [(first, min(first + chunk, pages)) for first in range(0, pages, chunk)]
+
+        path = upload_path(file_stream)
+        engines = [
+            ("pdfminer", get_process_pool, _pdfminer_pages, path or bytes(data)),
+            ("PyMuPDF", get_thread_pool, _pymupdf_pages, data),
+        ]
+        if PARALLEL_PDF_ENGINE == "pymupdf":
+            engines.reverse()
+
+        for name, get_pool, fn, source in engines:
+            futures = []
+            try:
+                pool = get_pool()
+                futures = [pool.submit(fn, source, first, last) for first, last in ranges]
+                text = "".join(future.result() for future in futures)
+                if text.strip():
+                    return text, f"{name} (parallel, {len(ranges)} chunks)"
+            except Exception as e:
+                print(f"⚠️ Parallel {name} failed: {e}")
+                for future in futures:
+                    future.cancel()
+        return "", None
+
+    def _ocr(self, file_stream):
+        print("🔎 No text layer found, trying OCR...")
+        with upload_buffer(file_stream) as data:
+            return ocr_pdf(data), "tesseract", None
+
+    def _extract(self, file_stream, ocr):
+        text = ""
+        extraction_method = None
+        pages = None
+
+        # Long documents: page ranges in parallel, short ones stay serial
+        if PARALLEL_PDF_MIN_PAGES > 0 and WORKER_PROCESSES > 1:
+            with upload_buffer(file_stream) as data:
+                try:
+                    pages = _count_pages(data)
+                except Exception as e:
+                    print(f"⚠️ Page count failed: {e}")
+                if pages and pages >= PARALLEL_PDF_MIN_PAGES:
+                    text, extraction_method = self._extract_parallel(file_stream, data, pages)
+                    if text.strip():
+                        return text, extraction_method, pages
+
+        # Try pdfminer
+        try:
+            from pdfminer.high_level import extract_text
+            file_stream.seek(0)
+            text = extract_text(file_stream)
+            extraction_method = "pdfminer"
+        except Exception as e:
+            print(f"⚠️ pdfminer failed: {e}")
+
+        # Fallback: PyPDF2
+        if not text.strip():
+            try:
+                import PyPDF2
+                file_stream.seek(0)
+                reader = PyPDF2.PdfReader(file_stream)
+                pages = len(reader.pages)
+                for page in reader.pages:
+                    text += page.extract_text() or ""
+                extraction_method = "PyPDF2"
+            except Exception as e:
+                print(f"⚠️ PyPDF2 failed: {e}")
+
+        # Fallback: PyMuPDF
+        if not text.strip():
+            try:
+                with upload_buffer(file_stream) as data, _open_pdf(upload_path(file_stream) or data) as doc:
+                    pages = doc.page_count
+                    for page in doc:
+                        text += page.get_text()
+                extraction_method = "PyMuPDF"
+            except Exception as e:
+                print(f"⚠️ PyMuPDF failed: {e}")
+
+        # Last resort: scanned/image-only PDF, OCR it locally
+        if not text.strip() and ocr:
+            text, extraction_method, _ = self._ocr(file_stream)
+
+        return text, extraction_method, pages
+
+
+class DocxExtractor(TextExtractor):
+    """
+    Reads word/document.xml straight out of the zip stream with iterparse,
+    clearing each paragraph as it goes, so no temp file or full DOM is built.
+    """
+    extensions = (".docx",)
+
+    W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+    def _extract(self, file_stream, ocr):
+        paragraphs = []
+        current = []
+        page_breaks = 0
+
+        with zipfile.ZipFile(file_stream) as archive:
+            with archive.open("word/document.xml") as xml_stream:
+                for _, element in iterparse(xml_stream, events=("end",)):
+                    tag = element.tag
+                    if tag == self.W_NS + "t":
+                        current.append(element.text or "")
+                    elif tag == self.W_NS + "tab":
+                        current.append("\t")
+                    elif tag in (self.W_NS + "br", self.W_NS + "cr"):
+                        if element.get(self.W_NS + "type") == "page":
+                            page_breaks += 1
+                        current.append("\n")
+                    elif tag == self.W_NS + "p":
+                        paragraphs.append("".join(current))
+                        current = []
+                        element.clear()
+
+        return "\n".join(paragraphs), "docx-xml", page_breaks + 1
+
+
+class TxtExtractor(TextExtractor):
+    """
+    Decodes plain text by BOM first, then strict UTF-8, then charset
+    detection, with cp1252 as the final lossy fallback.
+    """
+    extensions = (".txt",)
+
+    BOMS = (
+        (codecs.BOM_UTF32_LE, "utf-32"),
+        (codecs.BOM_UTF32_BE, "utf-32"),
+        (codecs.BOM_UTF8, "utf-8-sig"),
+        (codecs.BOM_UTF16_LE, "utf-16"),
+        (codecs.BOM_UTF16_BE, "utf-16"),
+    )
+
+    def _extract(self, file_stream, ocr):
+        data = file_stream.read()
+
+        for bom, encoding in self.BOMS:
+            if data.startswith(bom):
+                return data.decode(encoding, errors="replace"), f"text/{encoding}", None
+
+        try:
+            return data.decode("utf-8"), "text/utf-8", None
+        except UnicodeDecodeError:
+            pass
+
+        try:
+            from charset_normalizer import from_bytes
+            best = from_bytes(data).best()
+            if best is not None:
+                return str(best), f"text/{best.encoding}", None
+        except Exception as e:
+            print(f"⚠️ Charset detection failed: {e}")
+
+        return data.decode("cp1252", errors="replace"), "text/cp1252", None
+
+
+EXTRACTORS = [PdfExtractor(), DocxExtractor(), TxtExtractor()]
+_BY_EXTENSION = {ext: extractor for extractor in EXTRACTORS for ext in extractor.extensions}
+SUPPORTED_EXTENSIONS = sorted(_BY_EXTENSION)
+
+
+def get_extractor(filename: str) -> TextExtractor:
+    extension = os.path.splitext(filename or "")[1].lower()
+    extractor = _BY_EXTENSION.get(extension)
+    if extractor is None:
+        raise UnsupportedFormatError(
+            f"Unsupported file format. Please upload: {', '.join(SUPPORTED_EXTENSIONS)}"
+        )
+    return extractor
+
+
+def is_supported(filename: str) -> bool:
+    return os.path.splitext(filename or "")[1].lower() in _BY_EXTENSION
+
+
+def extract_document_text(file_stream, filename: str, ocr=True) -> Extraction:
+    """Extract text from an upload, picking the extractor by file extension."""
+    return get_extractor(filename).extract(file_stream, ocr)
+
+
+def ocr_document_text(file_stream, filename: str) -> Extraction:
+    """OCR an upload whose text layer came back empty; "" for formats without OCR."""
+    return get_extractor(filename).extract_ocr(file_stream)
@@ -0,0 +1,231 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from enum import IntEnum
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Limits for the whole server; under gunicorn each worker gets its share
+SERVER_WORKERS = max(1, int(os.getenv("SERVER_WORKERS", "1")))
+LLM_RATE_PER_MINUTE = float(os.getenv("LLM_RATE_PER_MINUTE", "60")) / SERVER_WORKERS
+LLM_BURST = max(1, int(os.getenv("LLM_BURST", "10")) // SERVER_WORKERS)
+LLM_MAX_CONCURRENCY = max(1, int(os.getenv("LLM_MAX_CONCURRENCY", "8")) // SERVER_WORKERS)
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0   # a user is waiting on the response (/analyze-resume etc.)
+    BACKGROUND = 1    # deferred or speculative work
+    BATCH = 2         # bulk jobs
+
+
+# How long a caller may wait in the queue before giving up, per priority
+QUEUE_TIMEOUTS = {
+    Priority.INTERACTIVE: float(os.getenv("LLM_QUEUE_TIMEOUT_INTERACTIVE", "20")),
+    Priority.BACKGROUND: float(os.getenv("LLM_QUEUE_TIMEOUT_BACKGROUND", "120")),
+    Priority.BATCH: float(os.getenv("LLM_QUEUE_TIMEOUT_BATCH", "600")),
+}
+
+
+class LLMQueueTimeout(Exception):
+    pass
+
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `capacity`. Not thread-safe."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self) -> bool:
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def time_until_token(self) -> float:
+        self._refill()
+        if self.tokens >= 1 or self.rate <= 0:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class LLMScheduler:
+    """
+    Process-wide gate in front of outbound LLM calls.
+
+    Callers queue by priority (FIFO within a priority) and are admitted when
+    they are at the head of the queue, fewer than max_concurrency calls are
+    running and the token bucket has a token. A caller still queued when its
+    deadline passes gets LLMQueueTimeout instead of a request that would
+    only be rate limited upstream. A caller that passes a ticket (an empty
+    dict) can be moved to a more urgent priority with promote() while it
+    is still queued.
+    """
+
+    def __init__(self, rate_per_minute=LLM_RATE_PER_MINUTE, burst=LLM_BURST, max_concurrency=LLM_MAX_CONCURRENCY):
+        self.max_concurrency = max_concurrency
+        self._bucket = TokenBucket(rate_per_minute / 60.0, burst)
+        self._cond = threading.Condition()
+        self._queue = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+
+        self._admitted = 0
+        self._timeouts = 0
+        # (admitted at, seconds waited, priority)
+        self._recent_waits = deque(maxlen=200)
+
+    @staticmethod
+    def _live(entry) -> bool:
+        """False for abandoned callers and for entries left behind by promote()."""
+        state = entry[2]
+        return not state["abandoned"] and state["entry"] is entry
+
+    def _drop_abandoned(self):
+        while self._queue and not self._live(self._queue[0]):
+            heapq.heappop(self._queue)
+
+    def acquire(self, priority=Priority.INTERACTIVE, timeout=None, ticket=None):
+        """Block until a call may go out. Must be paired with release()."""
+        priority = Priority(priority)
+        timeout = QUEUE_TIMEOUTS[priority] if timeout is None else timeout
+        enqueued = time.monotonic()
+        state = ticket if ticket is not None else {}
+        entry = (int(priority), next(self._seq), state)
+        state.update(abandoned=False, admitted=False, enqueued=enqueued, deadline=enqueued + timeout,
+                     priority=priority, entry=entry)
+
+        with self._cond:
+            heapq.heappush(self._queue, entry)
+            try:
+                while True:
+                    self._drop_abandoned()
+                    at_head = self._queue[0] is state["entry"]
+                    has_capacity = self._in_flight < self.max_concurrency
+
+                    if at_head and has_capacity and self._bucket.try_take():
+                        heapq.heappop(self._queue)
+                        state["admitted"] = True
+                        self._in_flight += 1
+                        self._admitted += 1
+                        now = time.monotonic()
+                        self._recent_waits.append((now, now - enqueued, state["priority"]))
+                        # The next caller may be admissible too
+                        self._cond.notify_all()
+                        return
+
+                    remaining = state["deadline"] - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise LLMQueueTimeout(
+                            f"LLM queue wait exceeded {time.monotonic() - enqueued:.1f}s "
+                            f"({state['priority'].name.lower()} priority)"
+                        )
+
+                    wait_for = remaining
+                    if at_head and has_capacity:
+                        wait_for = min(wait_for, max(self._bucket.time_until_token(), 0.001))
+                    self._cond.wait(wait_for)
+            except BaseException:
+                state["abandoned"] = True
+                self._drop_abandoned()
+                self._cond.notify_all()
+                raise
+
+    def promote(self, ticket, priority) -> bool:
+        """
+        Move a queued caller to a more urgent priority, shortening its deadline
+        to that priority's queue timeout if it is later. False if the caller
+        is no longer queued or already at least that urgent.
+        """
+        priority = Priority(priority)
+        with self._cond:
+            if ticket.get("entry") is None or ticket["admitted"] or ticket["abandoned"]:
+                return False
+            if priority >= ticket["priority"]:
+                return False
+            entry = (int(priority), next(self._seq), ticket)
+            ticket["entry"] = entry
+            ticket["priority"] = priority
+            ticket["deadline"] = min(ticket["deadline"], time.monotonic() + QUEUE_TIMEOUTS[priority])
+            heapq.heappush(self._queue, entry)
+            self._cond.notify_all()
+            return True
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, priority=Priority.INTERACTIVE, timeout=None, ticket=None):
+        self.acquire(priority, timeout, ticket)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        with self._cond:
+            depth = {p.name.lower(): 0 for p in Priority}
+            oldest = None
+            for entry in self._queue:
+                p, _, state = entry
+                if self._live(entry):
+                    depth[Priority(p).name.lower()] += 1
+                    oldest = state["enqueued"] if oldest is None else min(oldest, state["enqueued"])
+            waits = sorted(wait for _, wait, _ in self._recent_waits)
+
+        return {
+            "queue_depth": depth,
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "admitted_total": self._admitted,
+            "timeouts_total": self._timeouts,
+            "wait_seconds_avg": round(sum(waits) / len(waits), 4) if waits else 0.0,
+            "wait_seconds_p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 4) if waits else 0.0,
+            "oldest_wait_seconds": round(time.monotonic() - oldest, 4) if oldest is not None else 0.0,
+        }
+
+
+    def interactive_pressure(self, window: float) -> dict:
+        """
+        Queueing seen by interactive callers: p95 wait of those admitted in the
+        last `window` seconds (0 when there were none), the oldest one still
+        queued, and the queue depth. Background work is left out so deferred
+        calls waiting their turn do not count as user-facing overload.
+        """
+        now = time.monotonic()
+        with self._cond:
+            waits = sorted(
+                wait for admitted, wait, priority in self._recent_waits
+                if priority == Priority.INTERACTIVE and now - admitted <= window
+            )
+            queued = [
+                entry[2]["enqueued"] for entry in self._queue
+                if entry[0] == Priority.INTERACTIVE and self._live(entry)
+            ]
+        return {
+            "wait_p95": waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0,
+            "oldest_wait": now - min(queued) if queued else 0.0,
+            "queue_depth": len(queued),
+        }
+
+
+# Shared by every LLM helper in this process
+llm_scheduler = LLMScheduler()
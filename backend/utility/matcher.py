@@ -0,0 +1,259 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from dotenv import load_dotenv
+from scipy import sparse
+
+load_dotenv()
+
+# Resumes kept in the shared index per worker; the oldest are evicted first
+MATCH_INDEX_SIZE = int(os.getenv("MATCH_INDEX_SIZE", "20000"))
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+SKILL_PREFIX = "skill:"
+
+
+def tokenize(text: str) -> list:
+    """
+    Lowercase word tokens, keeping tech spellings like c++, c#, node.js intact.
+    """
+    return TOKEN_PATTERN.findall((text or "").lower())
+
+
+def skill_tokens(skills: list) -> list:
+    """
+    Map extracted skills to dedicated vocabulary entries so that a skill match
+    counts separately from a plain word match in the body text.
+    """
+    return [SKILL_PREFIX + s.strip().lower() for s in skills or [] if isinstance(s, str) and s.strip()]
+
+
+class ResumeMatcher:
+    """
+    BM25 index over resume text and skills, ranked against a job description.
+
+    Documents are appended incrementally: new rows are buffered and turned into
+    a column-major sparse segment on the next query, so adding a resume never
+    rebuilds the existing index. Ranking touches only the columns of the
+    query terms and selects the top-k with argpartition.
+
+    With max_docs set, adding past it evicts the oldest resumes: their rows
+    are tombstoned (skipped by ranking and document statistics) and dropped
+    from the matrix when their segment is next merged.
+    """
+
+    MAX_SEGMENTS = 8
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, skill_weight: float = 2.0, max_docs: int = None):
+        self.k1 = k1
+        self.b = b
+        self.skill_weight = skill_weight
+        self.max_docs = max_docs
+
+        self._lock = threading.RLock()
+        self._vocab = {}
+        self._doc_ids = []
+        # doc_id -> row, oldest first
+        self._doc_index = OrderedDict()
+        self._dead_rows = set()
+        self._doc_meta = []
+        self._doc_lengths = np.zeros(0, dtype=np.float32)
+        self._segments = []
+
+        # Rows added since the last consolidation
+        self._pending_rows = []
+        self._pending_cols = []
+        self._pending_vals = []
+        self._pending_lengths = []
+
+    def __len__(self):
+        with self._lock:
+            return len(self._doc_index)
+
+    def __contains__(self, doc_id):
+        with self._lock:
+            return doc_id in self._doc_index
+
+    def add(self, doc_id: str, text: str, skills: list = None, meta: dict = None) -> bool:
+        """
+        Index one resume. Returns False if the id is already indexed.
+        """
+        terms = tokenize(text)
+        counts = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0.0) + 1.0
+        for term in skill_tokens(skills):
+            counts[term] = counts.get(term, 0.0) + self.skill_weight
+
+        with self._lock:
+            if doc_id in self._doc_index:
+                return False
+
+            row = len(self._doc_ids)
+            self._doc_index[doc_id] = row
+            self._doc_ids.append(doc_id)
+            self._doc_meta.append(meta or {})
+
+            for term, count in counts.items():
+                col = self._vocab.setdefault(term, len(self._vocab))
+                self._pending_rows.append(row)
+                self._pending_cols.append(col)
+                self._pending_vals.append(count)
+            self._pending_lengths.append(sum(counts.values()))
+
+            while self.max_docs and len(self._doc_index) > self.max_docs:
+                _, evicted = self._doc_index.popitem(last=False)
+                self._dead_rows.add(evicted)
+            # Bound the memory even when nothing is ranked for a while
+            if len(self._dead_rows) > len(self._doc_index):
+                self._consolidate(full=True)
+            return True
+
+    def _dead_mask(self, start, end):
+        """Boolean mask of the tombstoned rows in [start, end). Caller holds the lock."""
+        mask = np.zeros(end - start, dtype=bool)
+        rows = [row - start for row in self._dead_rows if start <= row < end]
+        mask[rows] = True
+        return mask
+
+    def _compact_tail(self, start, segment):
+        """
+        Drop the tombstoned rows of the last segment, which starts at `start`,
+        renumbering the rows after them. Caller holds the lock; the lists are
+        replaced rather than edited so rankings in progress keep their snapshot.
+        """
+        keep = ~self._dead_mask(start, len(self._doc_ids))
+        if keep.all():
+            return segment
+        kept = np.flatnonzero(keep)
+        self._doc_ids = self._doc_ids[:start] + [self._doc_ids[start + i] for i in kept]
+        self._doc_meta = self._doc_meta[:start] + [self._doc_meta[start + i] for i in kept]
+        self._doc_lengths = np.concatenate([self._doc_lengths[:start], self._doc_lengths[start:][keep]])
+        self._dead_rows = {row for row in self._dead_rows if row < start}
+        for row in range(start, len(self._doc_ids)):
+            self._doc_index[self._doc_ids[row]] = row
+        return segment[kept]
+
+    def _consolidate(self, full=False):
+        """
+        Turn buffered rows into a new segment and merge small segments, so that
+        the cost of an insert is amortised instead of rewriting the full
+        matrix. full=True merges everything into one segment. Caller holds
+        the lock.
+        """
+        if self._pending_lengths:
+            # Pending documents are the last rows; some may have no postings
+            n_rows = len(self._pending_lengths)
+            first_row = len(self._doc_ids) - n_rows
+            segment = sparse.csc_matrix(
+                (
+                    np.asarray(self._pending_vals, dtype=np.float32),
+                    (
+                        np.asarray(self._pending_rows, dtype=np.int64) - first_row,
+                        np.asarray(self._pending_cols, dtype=np.int64),
+                    ),
+                ),
+                shape=(n_rows, len(self._vocab)),
+            )
+            self._segments.append((first_row, segment))
+            self._doc_lengths = np.concatenate([
+                self._doc_lengths, np.asarray(self._pending_lengths, dtype=np.float32)
+            ])
+
+            self._pending_rows = []
+            self._pending_cols = []
+            self._pending_vals = []
+            self._pending_lengths = []
+
+        # Tiered merge: fold the newest segment into its predecessor while it
+        # is at least half as large (counting live rows), keeping the segment
+        # count logarithmic. Merging drops the tombstoned rows.
+        while len(self._segments) > 1:
+            (start_a, seg_a), (start_b, seg_b) = self._segments[-2], self._segments[-1]
+            live_a = seg_a.shape[0] - int(self._dead_mask(start_a, start_b).sum())
+            if not full and seg_b.shape[0] * 2 < live_a and len(self._segments) <= self.MAX_SEGMENTS:
+                break
+            width = max(seg_a.shape[1], seg_b.shape[1])
+            merged = sparse.vstack([_widen(seg_a, width), _widen(seg_b, width)], format="csc")
+            self._segments[-2:] = [(start_a, self._compact_tail(start_a, merged))]
+
+        return list(self._segments), self._doc_lengths, self._dead_mask(0, len(self._doc_lengths))
+
+    def rank(self, job_description: str, skills: list = None, top_k: int = 10) -> list:
+        """
+        Return the top_k resumes for a job description as
+        [{'resume_id', 'score', **meta}], best first.
+        """
+        query_counts = {}
+        for term in tokenize(job_description) + skill_tokens(skills):
+            query_counts[term] = query_counts.get(term, 0) + 1
+
+        with self._lock:
+            if not self._doc_index:
+                return []
+            segments, doc_lengths, dead = self._consolidate()
+            terms = [t for t in query_counts if t in self._vocab]
+            cols = np.asarray([self._vocab[t] for t in terms], dtype=np.int64)
+            weights = np.asarray([query_counts[t] for t in terms], dtype=np.float32)
+            doc_ids = self._doc_ids
+            doc_meta = self._doc_meta
+
+        if not terms:
+            return []
+
+        n_docs = len(doc_lengths)
+        live = ~dead
+        n_live = int(live.sum())
+        avg_length = float(doc_lengths[live].mean()) or 1.0
+
+        # Slice the query columns out of every segment; terms newer than a
+        # segment simply have no postings in it. Tombstoned rows do not count
+        # towards document frequencies.
+        slices = []
+        doc_freq = np.zeros(len(cols), dtype=np.float32)
+        for start, segment in segments:
+            present = np.flatnonzero(cols < segment.shape[1])
+            sub = segment[:, cols[present]].tocoo()
+            doc_freq[present] += np.bincount(sub.col, weights=live[sub.row + start], minlength=len(present))
+            slices.append((start, present, sub))
+
+        idf = np.log1p((n_live - doc_freq + 0.5) / (doc_freq + 0.5)) * weights
+
+        scores = np.zeros(n_docs, dtype=np.float64)
+        for start, present, sub in slices:
+            rows = sub.row + start
+            tf = sub.data
+            norm = self.k1 * (1.0 - self.b + self.b * doc_lengths[rows] / avg_length)
+            contributions = idf[present][sub.col] * tf * (self.k1 + 1.0) / (tf + norm)
+            scores += np.bincount(rows, weights=contributions, minlength=n_docs)
+        scores[dead] = 0.0
+
+        top_k = max(1, min(int(top_k), n_docs))
+        if top_k < n_docs:
+            candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            candidates = np.arange(n_docs)
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        return [
+            {'resume_id': doc_ids[i], 'score': round(float(scores[i]), 4), **doc_meta[i]}
+            for i in candidates if scores[i] > 0
+        ]
+
+
+def _widen(matrix, width):
+    """Pad a CSC matrix with empty columns up to the given width."""
+    missing = width - matrix.shape[1]
+    if missing <= 0:
+        return matrix
+    indptr = np.concatenate([matrix.indptr, np.full(missing, matrix.indptr[-1], dtype=matrix.indptr.dtype)])
+    return sparse.csc_matrix((matrix.data, matrix.indices, indptr), shape=(matrix.shape[0], width))
+
+
+# Index of analysed resumes, fed by /analyze-resume. It lives in each worker
+# process: with several gunicorn workers, /match only ranks the resumes the
+# serving worker has analysed.
+resume_index = ResumeMatcher(max_docs=MATCH_INDEX_SIZE)
@@ -0,0 +1,120 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+from utility.pools import WORKER_PROCESSES, get_process_pool
+
+load_dotenv()
+
+OCR_ENABLED = os.getenv("OCR_ENABLED", "true").lower() == "true"
+OCR_LANG = os.getenv("OCR_LANG", "eng")
+OCR_DPI = int(os.getenv("OCR_DPI", "200"))
+OCR_MAX_PAGES = int(os.getenv("OCR_MAX_PAGES", "20"))
+# Enough text for the parsers to find contact details, skills and education
+OCR_MIN_CHARS = int(os.getenv("OCR_MIN_CHARS", "3000"))
+OCR_CACHE_SIZE = int(os.getenv("OCR_CACHE_SIZE", "2000"))
+
+_page_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _cache_get(page_hash):
+    with _cache_lock:
+        text = _page_cache.get(page_hash)
+        if text is not None:
+            _page_cache.move_to_end(page_hash)
+        return text
+
+
+def _cache_put(page_hash, text):
+    with _cache_lock:
+        _page_cache[page_hash] = text
+        _page_cache.move_to_end(page_hash)
+        while len(_page_cache) > OCR_CACHE_SIZE:
+            _page_cache.popitem(last=False)
+
+
+def _ocr_image(png_bytes: bytes, lang: str) -> str:
+    """Runs in a pool worker: OCR one rendered page."""
+    import pytesseract
+    from PIL import Image
+
+    with Image.open(io.BytesIO(png_bytes)) as image:
+        return pytesseract.image_to_string(image, lang=lang)
+
+
+def _render_pages(pdf_bytes, max_pages):
+    """Yield (page_hash, png_bytes) for each page, rendered in grayscale."""
+    import fitz  # PyMuPDF
+
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        for page in doc.pages(0, min(max_pages, doc.page_count)):
+            png = page.get_pixmap(dpi=OCR_DPI, colorspace=fitz.csGRAY).tobytes("png")
+            yield hashlib.sha256(png).hexdigest(), png
+    finally:
+        doc.close()
+
+
+def ocr_pdf(pdf_bytes, min_chars: int = OCR_MIN_CHARS, max_pages: int = OCR_MAX_PAGES) -> str:
+    """
+    OCR a scanned PDF with Tesseract, pages in parallel across the process pool.
+
+    Pages are rendered in order and kept WORKER_PROCESSES ahead of the page
+    being collected; once min_chars of text are recovered the remaining
+    pages are cancelled. OCR output is cached by a hash of the rendered page,
+    so resubmitted scans skip Tesseract entirely. Returns "" if OCR is
+    unavailable or nothing could be read.
+    """
+    if not OCR_ENABLED:
+        return ""
+
+    try:
+        pages = _render_pages(pdf_bytes, max_pages)
+        pool = get_process_pool()
+    except Exception as e:
+        print(f"⚠️ OCR unavailable: {e}")
+        return ""
+
+    texts = []
+    in_flight = []
+    total_chars = 0
+    try:
+        exhausted = False
+        while True:
+            while not exhausted and len(in_flight) < WORKER_PROCESSES:
+                page = next(pages, None)
+                if page is None:
+                    exhausted = True
+                    break
+                page_hash, png = page
+                cached = _cache_get(page_hash)
+                future = None if cached is not None else pool.submit(_ocr_image, png, OCR_LANG)
+                in_flight.append((page_hash, cached, future))
+
+            if not in_flight:
+                break
+
+            page_hash, cached, future = in_flight.pop(0)
+            if future is not None:
+                cached = future.result()
+                _cache_put(page_hash, cached)
+            texts.append(cached)
+            total_chars += len(cached.strip())
+
+            if total_chars >= min_chars:
+                print(f"🔎 OCR recovered {total_chars} chars after {len(texts)} page(s), stopping early")
+                break
+    except Exception as e:
+        print(f"⚠️ OCR failed: {e}")
+    finally:
+        for _, _, future in in_flight:
+            if future is not None:
+                future.cancel()
+        pages.close()
+
+    return "\n".join(texts)
@@ -0,0 +1,143 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from utility.llm_scheduler import llm_scheduler
+
+load_dotenv()
+
+# off   - always wait for the LLM
+# skip  - answer with local advice while overloaded
+# defer - answer with local advice and generate the real advice in the
+#         background, so it is cached for the candidate's next request
+OVERLOAD_MODE = os.getenv("OVERLOAD_MODE", "defer").lower()
+OVERLOAD_QUEUE_WAIT = float(os.getenv("OVERLOAD_QUEUE_WAIT", "5"))
+OVERLOAD_QUEUE_DEPTH = int(os.getenv("OVERLOAD_QUEUE_DEPTH", "20"))
+OVERLOAD_LATENCY = float(os.getenv("OVERLOAD_LATENCY", "15"))
+# Stay degraded at least this long once tripped, to avoid flapping
+OVERLOAD_COOLDOWN = float(os.getenv("OVERLOAD_COOLDOWN", "10"))
+OVERLOAD_MAX_DEFERRED = int(os.getenv("OVERLOAD_MAX_DEFERRED", "50"))
+# Signals are judged over this many recent seconds; with no LLM traffic they decay to zero
+OVERLOAD_WINDOW = float(os.getenv("OVERLOAD_WINDOW", "30"))
+# Fraction of requests still sent to the LLM while degraded, to re-measure it
+OVERLOAD_PROBE_RATE = float(os.getenv("OVERLOAD_PROBE_RATE", "0.05"))
+
+
+class OverloadController:
+    """
+    Decides whether /analyze-resume should skip the LLM generation.
+
+    It trips when any signal passes its threshold: the oldest or p95 wait of
+    interactive callers in the LLM scheduler queue, the interactive queue
+    depth, or the average generation latency. Only the last OVERLOAD_WINDOW
+    seconds count, so the signals fall back to zero once calls stop. Once
+    tripped it stays degraded for OVERLOAD_COOLDOWN seconds after the last
+    breach, while OVERLOAD_PROBE_RATE of requests still go to the LLM and
+    refresh the measurements.
+    """
+
+    def __init__(self, queue_wait=OVERLOAD_QUEUE_WAIT, queue_depth=OVERLOAD_QUEUE_DEPTH,
+                 latency=OVERLOAD_LATENCY, cooldown=OVERLOAD_COOLDOWN, window=OVERLOAD_WINDOW,
+                 probe_rate=OVERLOAD_PROBE_RATE):
+        self.queue_wait = queue_wait
+        self.queue_depth = queue_depth
+        self.latency = latency
+        self.cooldown = cooldown
+        self.window = window
+        self.probe_rate = probe_rate
+
+        self._lock = threading.Lock()
+        # (finished at, seconds)
+        self._latencies = deque(maxlen=200)
+        self._degraded_until = 0.0
+        self._last_reason = None
+        self._shed = 0
+        self._probes = 0
+
+        self._deferred = ThreadPoolExecutor(max_workers=2, thread_name_prefix="deferred-advice")
+        self._deferred_slots = threading.BoundedSemaphore(OVERLOAD_MAX_DEFERRED)
+
+    def record_latency(self, seconds: float):
+        """Feed the duration of a completed LLM call."""
+        with self._lock:
+            self._latencies.append((time.monotonic(), seconds))
+
+    def _recent_latency(self) -> float:
+        now = time.monotonic()
+        with self._lock:
+            recent = [seconds for finished, seconds in self._latencies if now - finished <= self.window]
+        return sum(recent) / len(recent) if recent else 0.0
+
+    def _breach(self):
+        pressure = llm_scheduler.interactive_pressure(self.window)
+        wait = max(pressure["oldest_wait"], pressure["wait_p95"])
+        if wait >= self.queue_wait:
+            return f"LLM queue wait {wait:.1f}s"
+        if pressure["queue_depth"] >= self.queue_depth:
+            return f"LLM queue depth {pressure['queue_depth']}"
+        latency = self._recent_latency()
+        if latency >= self.latency:
+            return f"LLM latency {latency:.1f}s"
+        return None
+
+    def should_degrade(self):
+        """Return the reason to degrade, or None to call the LLM as usual."""
+        if OVERLOAD_MODE == "off":
+            return None
+
+        now = time.monotonic()
+        reason = self._breach()
+        with self._lock:
+            if reason:
+                self._degraded_until = now + self.cooldown
+                self._last_reason = reason
+            elif now >= self._degraded_until:
+                return None
+            if random.random() < self.probe_rate:
+                self._probes += 1
+                return None
+            self._shed += 1
+            return self._last_reason
+
+    def overloaded(self) -> bool:
+        """Whether should_degrade() would degrade, without counting a shed request."""
+        if OVERLOAD_MODE == "off":
+            return False
+        with self._lock:
+            if time.monotonic() < self._degraded_until:
+                return True
+        return self._breach() is not None
+
+    def defer(self, fn, *args, **kwargs) -> bool:
+        """Run fn in the background if there is room; False if it was dropped."""
+        if not self._deferred_slots.acquire(blocking=False):
+            return False
+
+        def _run():
+            try:
+                fn(*args, **kwargs)
+            finally:
+                self._deferred_slots.release()
+
+        self._deferred.submit(_run)
+        return True
+
+    def stats(self) -> dict:
+        latency = self._recent_latency()
+        with self._lock:
+            return {
+                'mode': OVERLOAD_MODE,
+                'degraded': time.monotonic() < self._degraded_until,
+                'last_reason': self._last_reason,
+                'llm_latency_recent_seconds': round(latency, 3),
+                'shed_total': self._shed,
+                'probes_total': self._probes
+            }
+
+
+overload_controller = OverloadController()
@@ -0,0 +1,56 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Pool size for the whole server (default: one per CPU); under gunicorn each
+# worker gets its share, so the workers do not each start cpu_count processes
+SERVER_WORKERS = max(1, int(os.getenv("SERVER_WORKERS", "1")))
+WORKER_PROCESSES = max(1, (int(os.getenv("WORKER_PROCESSES", "0")) or os.cpu_count() or 1) // SERVER_WORKERS)
+# spawn keeps the workers independent of the request threads of the parent
+POOL_START_METHOD = os.getenv("POOL_START_METHOD", "spawn")
+
+_process_pool = None
+_thread_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Shared process pool for CPU-bound work (OCR, page extraction).
+    Created on first use so that importing the app stays cheap.
+    """
+    global _process_pool
+    with _pool_lock:
+        # A worker that died (OOM, segfault in a parser) breaks the whole
+        # pool; replace it instead of failing every later submission
+        if _process_pool is not None and getattr(_process_pool, "_broken", False):
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=WORKER_PROCESSES,
+                mp_context=multiprocessing.get_context(POOL_START_METHOD)
+            )
+        return _process_pool
+
+
+def get_thread_pool() -> ThreadPoolExecutor:
+    """Shared thread pool for work that releases the GIL (e.g. PyMuPDF)."""
+    global _thread_pool
+    with _pool_lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(max_workers=WORKER_PROCESSES, thread_name_prefix="extract")
+        return _thread_pool
+
+
+def shutdown_process_pool():
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
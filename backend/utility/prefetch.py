@@ -0,0 +1,166 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from utility.llm_scheduler import TokenBucket
+from utility.overload import overload_controller
+
+load_dotenv()
+
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "false").lower() == "true"
+# Interview questions are prefetched for this many of the suggested roles
+PREFETCH_TOP_ROLES = int(os.getenv("PREFETCH_TOP_ROLES", "2"))
+# Unread results (and work that has not started) are dropped after this long
+PREFETCH_TTL = float(os.getenv("PREFETCH_TTL", "600"))
+# At most this many prefetch generations are started per minute
+PREFETCH_BUDGET_PER_MINUTE = float(os.getenv("PREFETCH_BUDGET_PER_MINUTE", "20"))
+PREFETCH_MAX_PENDING = int(os.getenv("PREFETCH_MAX_PENDING", "20"))
+PREFETCH_MAX_ENTRIES = int(os.getenv("PREFETCH_MAX_ENTRIES", "1000"))
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "2"))
+
+
+class _Entry:
+    __slots__ = ("state", "created", "finished", "future", "result")
+
+    def __init__(self):
+        self.state = "pending"
+        self.created = time.monotonic()
+        self.finished = None
+        self.future = None
+        self.result = None
+
+
+class Prefetcher:
+    """
+    Runs speculative generations in the background and holds each result
+    until it is read once or PREFETCH_TTL passes.
+
+    take(key) decides what happens to a key the client now actually wants:
+    a finished result is served; work still queued here is cancelled so the
+    caller generates it at its own priority; work already running is left
+    to finish, and the caller joins it through generate_text's single-flight
+    (the result is then not kept a second time). A joined generation still
+    waiting in the LLM scheduler is raised to the caller's priority, so the
+    caller never waits at background priority. Scheduling is refused while
+    the LLM is overloaded or the per-minute budget is spent, and the oldest
+    queued work is cancelled when more than PREFETCH_MAX_PENDING pile up.
+    """
+
+    def __init__(self, ttl=PREFETCH_TTL, budget_per_minute=PREFETCH_BUDGET_PER_MINUTE,
+                 max_pending=PREFETCH_MAX_PENDING, max_entries=PREFETCH_MAX_ENTRIES, workers=PREFETCH_WORKERS):
+        self.ttl = ttl
+        self.max_pending = max_pending
+        self.max_entries = max_entries
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._budget = TokenBucket(budget_per_minute / 60.0, int(budget_per_minute))
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._counts = {
+            'scheduled': 0, 'hits': 0, 'joined': 0, 'cancelled': 0, 'expired': 0, 'failed': 0,
+            'skipped_budget': 0, 'skipped_overload': 0
+        }
+
+    def _expired(self, entry, now) -> bool:
+        started = entry.finished if entry.state == "done" else entry.created
+        return entry.state != "running" and now - started > self.ttl
+
+    def _drop(self, key, reason):
+        entry = self._entries.pop(key)
+        if entry.future is not None:
+            entry.future.cancel()
+        self._counts[reason] += 1
+
+    def _sweep(self, now):
+        for key in [k for k, e in self._entries.items() if self._expired(e, now)]:
+            self._drop(key, 'expired')
+
+        pending = [k for k, e in self._entries.items() if e.state == "pending"]
+        for key in pending[:max(0, len(pending) - self.max_pending + 1)]:
+            self._drop(key, 'cancelled')
+
+        finished = [k for k, e in self._entries.items() if e.state == "done"]
+        for key in finished[:max(0, len(self._entries) - self.max_entries + 1)]:
+            self._drop(key, 'expired')
+
+    def schedule(self, key, fn, *args, **kwargs) -> bool:
+        """Start fn(*args, **kwargs) in the background for key; False if skipped."""
+        if overload_controller.overloaded():
+            with self._lock:
+                self._counts['skipped_overload'] += 1
+            return False
+
+        with self._lock:
+            if key in self._entries:
+                return False
+            if not self._budget.try_take():
+                self._counts['skipped_budget'] += 1
+                return False
+            self._sweep(time.monotonic())
+            entry = self._entries[key] = _Entry()
+            entry.future = self._executor.submit(self._run, key, entry, fn, args, kwargs)
+            self._counts['scheduled'] += 1
+            return True
+
+    def _run(self, key, entry, fn, args, kwargs):
+        with self._lock:
+            if self._entries.get(key) is not entry:
+                return
+            if self._expired(entry, time.monotonic()):
+                self._drop(key, 'expired')
+                return
+            entry.state = "running"
+
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            print(f"⚠️ Prefetch of {key[0]} failed: {e}")
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+                self._counts['failed'] += 1
+            return
+
+        with self._lock:
+            # Taken while running: the reader got it through the single-flight
+            if self._entries.get(key) is entry:
+                entry.result = result
+                entry.finished = time.monotonic()
+                entry.state = "done"
+
+    def take(self, key):
+        """The prefetched result for key, served once; None if there is none (yet)."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            if entry.state == "done":
+                if self._expired(entry, time.monotonic()):
+                    self._counts['expired'] += 1
+                    return None
+                self._counts['hits'] += 1
+                return entry.result
+            if entry.state == "pending":
+                entry.future.cancel()
+                self._counts['cancelled'] += 1
+            else:
+                self._counts['joined'] += 1
+            return None
+
+    def stats(self) -> dict:
+        with self._lock:
+            states = [e.state for e in self._entries.values()]
+            return {
+                'enabled': PREFETCH_ENABLED,
+                'pending': states.count("pending"),
+                'running': states.count("running"),
+                'ready': states.count("done"),
+                **self._counts
+            }
+
+
+prefetcher = Prefetcher()
@@ -0,0 +1,263 @@
+"""
+Opt-in request profiling for /analyze-resume.
+
+With PROFILING_ENABLED=true every profiled request is sampled by one shared
+background thread that reads the request thread's stack every
+PROFILE_SAMPLE_INTERVAL seconds (a statistical profiler, so the overhead is
+independent of how much Python the request runs). A profile is kept when:
+
+- the client sent "X-Profile: 1",
+- the request was picked by PROFILE_SAMPLE_RATE, or
+- it took longer than SLOW_REQUEST_THRESHOLD seconds.
+
+Kept profiles hold the per-stage timings, an anonymized document fingerprint
+and the sampled stacks in folded format ("root;caller;callee count"), which
+flamegraph.pl, speedscope and similar tools read directly. The newest
+PROFILE_BUFFER_SIZE profiles are kept in memory.
+
+Under gevent workers the sampler runs in a real OS thread and follows the
+request's greenlet: the worker thread's stack while that greenlet is the one
+running, its suspended frame while it waits on I/O.
+"""
+import hmac
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+from flask import g, request
+
+load_dotenv()
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.01"))
+SLOW_REQUEST_THRESHOLD = float(os.getenv("SLOW_REQUEST_THRESHOLD", "10"))
+PROFILE_BUFFER_SIZE = int(os.getenv("PROFILE_BUFFER_SIZE", "50"))
+# Required by the /admin/profiles endpoints, which are hidden while unset
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+PROFILED_PATHS = {"/analyze-resume"}
+MAX_STACK_DEPTH = 128
+
+_ids = itertools.count(1)
+_local = threading.local()
+
+
+class RequestProfile:
+    def __init__(self, path, trigger):
+        self.id = next(_ids)
+        self.path = path
+        self.trigger = trigger
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        self.duration = None
+        self.stages = []
+        self.fingerprint = {}
+        self.stacks = Counter()
+        self.samples = 0
+
+    def add_stack(self, frame):
+        names = []
+        while frame is not None and len(names) < MAX_STACK_DEPTH:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        self.stacks[";".join(reversed(names))] += 1
+        self.samples += 1
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def summary(self) -> dict:
+        return {
+            'id': self.id,
+            'path': self.path,
+            'trigger': self.trigger,
+            'started_at': self.started_at,
+            'duration_seconds': round(self.duration or 0.0, 4),
+            'stages': self.stages,
+            'fingerprint': self.fingerprint,
+            'samples': self.samples
+        }
+
+
+def _gevent_patched() -> bool:
+    """True when gevent has monkey-patched threading (gunicorn's gevent workers)."""
+    monkey = sys.modules.get("gevent.monkey")
+    return monkey is not None and monkey.is_module_patched("threading")
+
+
+class _Sampler:
+    """
+    One daemon thread sampling the stacks of every registered request.
+
+    Requests are keyed by thread id. Under gevent, thread ids are greenlet ids
+    that sys._current_frames() does not know, and a patched thread would only
+    run when the request yields; the sampler then uses gevent's original
+    thread primitives and keys requests by (greenlet, OS thread id).
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._active = {}
+        self._thread = None
+        self.gevent = _gevent_patched()
+        if self.gevent:
+            from gevent import monkey
+            import greenlet
+            self._lock = monkey.get_original("_thread", "allocate_lock")()
+            self._start_thread = monkey.get_original("_thread", "start_new_thread")
+            self._sleep = monkey.get_original("time", "sleep")
+            self._os_thread_id = monkey.get_original("_thread", "get_ident")
+            self._greenlet = greenlet.getcurrent
+        else:
+            self._lock = threading.Lock()
+            self._sleep = time.sleep
+
+    def current_key(self):
+        """Sampling key of the calling request."""
+        if self.gevent:
+            return self._greenlet(), self._os_thread_id()
+        return threading.get_ident()
+
+    def register(self, key, profile):
+        with self._lock:
+            self._active[key] = profile
+            if self._thread is None:
+                if self.gevent:
+                    self._thread = self._start_thread(self._run, ())
+                else:
+                    self._thread = threading.Thread(target=self._run, name="request-sampler", daemon=True)
+                    self._thread.start()
+
+    def unregister(self, key):
+        with self._lock:
+            self._active.pop(key, None)
+
+    def _frame(self, key, frames):
+        if not self.gevent:
+            return frames.get(key)
+        glet, thread_id = key
+        if glet.dead:
+            return None
+        # gr_frame is only set while the greenlet is switched out; while it
+        # runs, its stack is the OS thread's
+        return glet.gr_frame or frames.get(thread_id)
+
+    def _run(self):
+        while True:
+            self._sleep(self.interval)
+            with self._lock:
+                active = list(self._active.items())
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for key, profile in active:
+                frame = self._frame(key, frames)
+                if frame is not None:
+                    profile.add_stack(frame)
+
+
+_sampler = _Sampler(PROFILE_SAMPLE_INTERVAL)
+profile_buffer = deque(maxlen=PROFILE_BUFFER_SIZE)
+_buffer_lock = threading.Lock()
+
+
+def current_profile():
+    return getattr(_local, "profile", None)
+
+
+@contextmanager
+def stage(name: str):
+    """Time a pipeline stage of the current request (no-op when not profiling)."""
+    profile = current_profile()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.stages.append({
+            'stage': name,
+            'offset_seconds': round(started - profile.started, 4),
+            'duration_seconds': round(time.perf_counter() - started, 4)
+        })
+
+
+def set_fingerprint(**fields):
+    """Attach anonymized document facts (hash, size, type) to the current profile."""
+    profile = current_profile()
+    if profile is not None:
+        profile.fingerprint.update(fields)
+
+
+def admin_authorized(req) -> bool:
+    """True if the request carries ADMIN_TOKEN as "Authorization: Bearer <token>"."""
+    if not ADMIN_TOKEN:
+        return False
+    supplied = req.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    return hmac.compare_digest(supplied.encode(), ADMIN_TOKEN.encode())
+
+
+def get_profile(profile_id: int):
+    with _buffer_lock:
+        return next((p for p in profile_buffer if p.id == profile_id), None)
+
+
+def list_profiles() -> list:
+    with _buffer_lock:
+        return [p.summary() for p in reversed(profile_buffer)]
+
+
+def init_profiling(app):
+    """Register the request hooks. Does nothing unless PROFILING_ENABLED."""
+    if not PROFILING_ENABLED:
+        return app
+
+    @app.before_request
+    def start_profile():
+        if request.path not in PROFILED_PATHS:
+            return
+        if request.headers.get("X-Profile") == "1":
+            trigger = "requested"
+        elif PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+            trigger = "sampled"
+        else:
+            # Sampled anyway so that a slow request can still be captured
+            trigger = "slow"
+        profile = RequestProfile(request.path, trigger)
+        _local.profile = profile
+        g.profile_key = _sampler.current_key()
+        _sampler.register(g.profile_key, profile)
+
+    @app.after_request
+    def finish_profile(response):
+        profile = current_profile()
+        if profile is None:
+            return response
+        _sampler.unregister(g.pop("profile_key", None))
+        _local.profile = None
+        profile.duration = time.perf_counter() - profile.started
+
+        if profile.trigger != "slow" or profile.duration >= SLOW_REQUEST_THRESHOLD:
+            with _buffer_lock:
+                profile_buffer.append(profile)
+            response.headers["X-Profile-Id"] = str(profile.id)
+            if profile.trigger == "slow":
+                print(f"🐢 Slow request captured as profile {profile.id} ({profile.duration:.1f}s)")
+        return response
+
+    @app.teardown_request
+    def clear_profile(exc):
+        # after_request is skipped on unhandled errors
+        if current_profile() is not None:
+            _sampler.unregister(g.pop("profile_key", None))
+            _local.profile = None
+
+    return app
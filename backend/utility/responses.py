@@ -0,0 +1,113 @@
+import gzip
+import os
+
+from dotenv import load_dotenv
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+load_dotenv()
+
+# "orjson" (default, when installed) or "stdlib"
+JSON_BACKEND = os.getenv("JSON_BACKEND", "orjson").lower()
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+
+# Left out of /analyze-resume responses unless requested with ?fields=
+DEFAULT_EXCLUDED_FIELDS = {"affinda_raw"}
+# Always kept so clients can tell success from failure
+ALWAYS_INCLUDED_FIELDS = {"status", "error", "message"}
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def project_fields(result: dict, fields: str = None) -> dict:
+    """
+    Select the top-level fields of a result.
+
+    fields is the raw ?fields= value: a comma-separated list of field names,
+    or "all" for everything including raw vendor data. Without it every field
+    except DEFAULT_EXCLUDED_FIELDS is returned.
+    """
+    if not isinstance(result, dict):
+        return result
+
+    if not fields:
+        return {k: v for k, v in result.items() if k not in DEFAULT_EXCLUDED_FIELDS}
+
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    if "all" in requested or "*" in requested:
+        return dict(result)
+
+    return {k: v for k, v in result.items() if k in requested or k in ALWAYS_INCLUDED_FIELDS}
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that serializes with orjson; loads stay on the stdlib."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        data = orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS)
+        return self._app.response_class(data, mimetype=self.mimetype)
+
+
+def configure_json(app):
+    """Swap in the fastest available JSON encoder for jsonify()."""
+    if JSON_BACKEND == "orjson" and orjson is not None:
+        app.json_provider_class = OrjsonProvider
+        app.json = OrjsonProvider(app)
+    return app.json
+
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return None
+
+
+def init_compression(app):
+    """Compress JSON and text responses according to the client's Accept-Encoding."""
+
+    @app.after_request
+    def compress_response(response):
+        if (
+            response.direct_passthrough
+            or response.status_code < 200
+            or response.status_code in (204, 304)
+            or "Content-Encoding" in response.headers
+            or not (response.is_json or response.mimetype.startswith("text/"))
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return response
+
+        encoding = _choose_encoding()
+        if encoding == "br":
+            compressed = brotli.compress(data, quality=BROTLI_QUALITY)
+        elif encoding == "gzip":
+            compressed = gzip.compress(data, compresslevel=GZIP_LEVEL)
+        else:
+            return response
+
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        return response
+
+    return app
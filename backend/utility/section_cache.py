@@ -0,0 +1,66 @@
+import hashlib
+import os
+import re
+
+from dotenv import load_dotenv
+
+from utility.cache import LRUCache
+
+load_dotenv()
+
+SECTION_CACHE_SIZE = int(os.getenv("SECTION_CACHE_SIZE", "20000"))
+
+KNOWN_HEADINGS = {
+    'summary', 'professional summary', 'objective', 'career objective', 'profile', 'about me',
+    'experience', 'work experience', 'professional experience', 'employment', 'employment history',
+    'education', 'academic background', 'qualifications',
+    'skills', 'technical skills', 'key skills', 'core competencies',
+    'projects', 'personal projects', 'academic projects',
+    'certifications', 'certificates', 'licenses',
+    'achievements', 'awards', 'interests', 'hobbies', 'languages', 'publications', 'references'
+}
+ALL_CAPS_HEADING = re.compile(r'^[A-Z][A-Z &/-]{2,40}:?$')
+
+# (extractor name, segment hash) -> that extractor's result on the segment
+section_cache = LRUCache(SECTION_CACHE_SIZE)
+
+
+def is_heading(line: str) -> bool:
+    stripped = line.strip()
+    if not stripped or len(stripped) > 42:
+        return False
+    return stripped.rstrip(':').strip().lower() in KNOWN_HEADINGS or bool(ALL_CAPS_HEADING.match(stripped))
+
+
+def split_sections(text: str) -> list:
+    """
+    Split resume text into segments at section headings. The first segment is
+    the header block (name, contact details). Joining the segments with
+    newlines gives back the original text.
+    """
+    segments = []
+    current = []
+    for line in text.split('\n'):
+        if is_heading(line) and current:
+            segments.append('\n'.join(current))
+            current = []
+        current.append(line)
+    segments.append('\n'.join(current))
+    return segments
+
+
+def map_segments(name: str, fn, segments: list) -> list:
+    """
+    Apply fn to every segment, reusing cached results for segments whose text
+    has been seen before. A revised resume therefore only re-runs fn on the
+    sections that actually changed.
+    """
+    results = []
+    for segment in segments:
+        key = (name, hashlib.sha1(segment.encode('utf-8')).hexdigest())
+        value = section_cache.get(key)
+        if value is None:
+            value = fn(segment)
+            section_cache.put(key, value)
+        results.append(value)
+    return results
@@ -0,0 +1,328 @@
+"""
+Skill / role taxonomy, compiled from data/taxonomy.json into a binary artifact
+that every worker memory-maps.
+
+Artifact layout (little-endian):
+
+    header    magic b"RTAX", format version, taxonomy version, section count
+    directory one (16-byte name, byte offset, item count) entry per section
+    sections  uint32 arrays, except "string_data" (raw UTF-8 bytes)
+
+All strings live once in a sorted string table ("string_offsets" +
+"string_data"); every other section refers to them by id. "keywords" /
+"kw_role_*" is a precomputed inverted index (keyword -> roles) in CSR form, so career
+suggestions cost one lookup per skill instead of a scan over every role.
+
+Compile with:  python -m utility.taxonomy
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+_BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TAXONOMY_SOURCE = os.getenv("TAXONOMY_SOURCE", os.path.join(_BACKEND_DIR, "data", "taxonomy.json"))
+TAXONOMY_ARTIFACT = os.getenv("TAXONOMY_ARTIFACT", os.path.join(_BACKEND_DIR, "data", "taxonomy.bin"))
+# How often workers stat the artifact for a newer version
+TAXONOMY_CHECK_INTERVAL = float(os.getenv("TAXONOMY_CHECK_INTERVAL", "5"))
+
+MAGIC = b"RTAX"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sIII")
+_DIRECTORY_ENTRY = struct.Struct("<16sII")
+
+
+# -----------------------------
+# Compiler
+# -----------------------------
+
+def _csr(groups):
+    """Flatten a list of id lists into (offsets, values)."""
+    offsets = array("I", [0])
+    values = array("I")
+    for group in groups:
+        values.extend(group)
+        offsets.append(len(values))
+    return offsets, values
+
+
+def compile_taxonomy(source_path: str = TAXONOMY_SOURCE, artifact_path: str = TAXONOMY_ARTIFACT) -> str:
+    """
+    Compile the JSON taxonomy into the binary artifact. The file is written
+    next to the target and renamed over it, so readers never see a partial
+    artifact and workers pick the new version up atomically.
+    """
+    with open(source_path, encoding="utf-8") as f:
+        source = json.load(f)
+
+    tech = [s.lower() for s in source["skills"]["tech"]]
+    soft = [s.lower() for s in source["skills"]["soft"]]
+    skills = tech + soft
+    fallback = [s.lower() for s in source["fallback_skill_keywords"]]
+    certs = [s.lower() for s in source["cert_keywords"]]
+    roles = {role: [k.lower() for k in keywords] for role, keywords in source["roles"].items()}
+
+    strings = set(skills) | set(fallback) | set(certs) | set(roles)
+    strings |= {s.title() for s in skills + fallback}
+    for keywords in roles.values():
+        strings.update(keywords)
+    strings = sorted(strings)
+    ids = {s: i for i, s in enumerate(strings)}
+
+    encoded = [s.encode("utf-8") for s in strings]
+    string_offsets = array("I", [0])
+    for data in encoded:
+        string_offsets.append(string_offsets[-1] + len(data))
+
+    role_names = sorted(roles)
+    role_keyword_offsets, role_keyword_ids = _csr([[ids[k] for k in roles[r]] for r in role_names])
+
+    keyword_to_roles = {}
+    for role_index, role in enumerate(role_names):
+        for keyword in roles[role]:
+            keyword_to_roles.setdefault(ids[keyword], set()).add(role_index)
+    keywords = sorted(keyword_to_roles)
+    keyword_role_offsets, keyword_role_ids = _csr([sorted(keyword_to_roles[k]) for k in keywords])
+
+    sections = [
+        ("string_offsets", string_offsets),
+        ("string_data", b"".join(encoded)),
+        ("skills", array("I", [ids[s] for s in skills])),
+        ("skill_titles", array("I", [ids[s.title()] for s in skills])),
+        ("tech_count", array("I", [len(tech)])),
+        ("fallback", array("I", [ids[s] for s in fallback])),
+        ("fallback_titles", array("I", [ids[s.title()] for s in fallback])),
+        ("certs", array("I", [ids[s] for s in certs])),
+        ("roles", array("I", [ids[r] for r in role_names])),
+        ("role_kw_offsets", role_keyword_offsets),
+        ("role_kw_ids", role_keyword_ids),
+        ("keywords", array("I", keywords)),
+        ("kw_role_offsets", keyword_role_offsets),
+        ("kw_role_ids", keyword_role_ids),
+    ]
+
+    if sys.byteorder != "little":
+        for _, data in sections:
+            if isinstance(data, array):
+                data.byteswap()
+
+    header_size = _HEADER.size + _DIRECTORY_ENTRY.size * len(sections)
+    directory = []
+    payload = []
+    offset = header_size
+    for name, data in sections:
+        raw = data if isinstance(data, bytes) else data.tobytes()
+        # Keep uint32 sections 4-byte aligned for memoryview.cast
+        padding = (-offset) % 4
+        payload.append(b"\0" * padding + raw)
+        offset += padding
+        count = len(raw) if isinstance(data, bytes) else len(data)
+        directory.append(_DIRECTORY_ENTRY.pack(name.encode("ascii"), offset, count))
+        offset += len(raw)
+
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, int(source.get("version", 0)), len(sections))
+
+    target_dir = os.path.dirname(os.path.abspath(artifact_path))
+    fd, tmp_path = tempfile.mkstemp(dir=target_dir, prefix=".taxonomy-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header)
+            f.write(b"".join(directory))
+            f.write(b"".join(payload))
+        os.replace(tmp_path, artifact_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return artifact_path
+
+
+# -----------------------------
+# Memory-mapped reader
+# -----------------------------
+
+class Taxonomy:
+    """
+    Read-only view over a memory-mapped artifact. Pages are shared between
+    every process that maps the same file; only the strings a worker
+    actually uses are decoded (and interned) on its side.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.path = path
+        self.mtime = os.stat(path).st_mtime_ns
+        # Changes whenever a new artifact is published; part of cache keys
+        # for results derived from the taxonomy
+        self.fingerprint = f"{path}:{self.mtime}"
+
+        view = memoryview(self._mmap)
+        magic, format_version, self.version, section_count = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError(f"Not a taxonomy artifact (format {format_version}): {path}")
+
+        self._sections = {}
+        for i in range(section_count):
+            raw_name, offset, count = _DIRECTORY_ENTRY.unpack_from(view, _HEADER.size + i * _DIRECTORY_ENTRY.size)
+            name = raw_name.rstrip(b"\0").decode("ascii")
+            if name == "string_data":
+                self._sections[name] = view[offset:offset + count]
+            else:
+                self._sections[name] = view[offset:offset + count * 4].cast("I")
+
+        self._string_offsets = self._sections["string_offsets"]
+        self._decoded = [None] * (len(self._string_offsets) - 1)
+        self._lock = threading.Lock()
+        self._lists = {}
+
+    def string(self, string_id: int) -> str:
+        value = self._decoded[string_id]
+        if value is None:
+            start, end = self._string_offsets[string_id], self._string_offsets[string_id + 1]
+            value = sys.intern(bytes(self._sections["string_data"][start:end]).decode("utf-8"))
+            self._decoded[string_id] = value
+        return value
+
+    def _strings(self, section: str) -> tuple:
+        values = self._lists.get(section)
+        if values is None:
+            with self._lock:
+                values = tuple(self.string(i) for i in self._sections[section])
+                self._lists[section] = values
+        return values
+
+    def _pairs(self, section: str, titles_section: str) -> tuple:
+        key = (section, titles_section)
+        values = self._lists.get(key)
+        if values is None:
+            values = tuple(zip(self._strings(section), self._strings(titles_section)))
+            self._lists[key] = values
+        return values
+
+    def string_id(self, value: str):
+        """Binary search of the sorted string table; None if absent."""
+        data = self._sections["string_data"]
+        offsets = self._string_offsets
+        target = value.encode("utf-8")
+        lo, hi = 0, len(offsets) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bytes(data[offsets[mid]:offsets[mid + 1]]) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(offsets) - 1 and bytes(data[offsets[lo]:offsets[lo + 1]]) == target:
+            return lo
+        return None
+
+    @property
+    def skills(self) -> tuple:
+        """(phrase, display title) for every tech then soft skill."""
+        return self._pairs("skills", "skill_titles")
+
+    @property
+    def tech_skills(self) -> tuple:
+        return self._strings("skills")[:self._sections["tech_count"][0]]
+
+    @property
+    def soft_skills(self) -> tuple:
+        return self._strings("skills")[self._sections["tech_count"][0]:]
+
+    @property
+    def fallback_skills(self) -> tuple:
+        return self._pairs("fallback", "fallback_titles")
+
+    @property
+    def cert_keywords(self) -> tuple:
+        return self._strings("certs")
+
+    @property
+    def role_names(self) -> tuple:
+        return self._strings("roles")
+
+    def role_keywords(self, role: str) -> tuple:
+        roles = self.role_names
+        index = bisect_left(roles, role)
+        if index == len(roles) or roles[index] != role:
+            return ()
+        offsets = self._sections["role_kw_offsets"]
+        ids = self._sections["role_kw_ids"]
+        return tuple(self.string(i) for i in ids[offsets[index]:offsets[index + 1]])
+
+    def roles_for_keyword(self, keyword: str) -> tuple:
+        """Roles listing this exact (lowercase) keyword."""
+        string_id = self.string_id(keyword)
+        if string_id is None:
+            return ()
+        keywords = self._sections["keywords"]
+        index = bisect_left(keywords, string_id)
+        if index == len(keywords) or keywords[index] != string_id:
+            return ()
+        offsets = self._sections["kw_role_offsets"]
+        roles = self.role_names
+        return tuple(roles[r] for r in self._sections["kw_role_ids"][offsets[index]:offsets[index + 1]])
+
+
+# -----------------------------
+# Hot-reloading accessor
+# -----------------------------
+
+_current = None
+_last_check = 0.0
+_reload_lock = threading.Lock()
+
+
+def _artifact_is_stale() -> bool:
+    if not os.path.exists(TAXONOMY_ARTIFACT):
+        return True
+    return (
+        os.path.exists(TAXONOMY_SOURCE)
+        and os.stat(TAXONOMY_SOURCE).st_mtime_ns > os.stat(TAXONOMY_ARTIFACT).st_mtime_ns
+    )
+
+
+def get_taxonomy() -> Taxonomy:
+    """
+    Current taxonomy. At most every TAXONOMY_CHECK_INTERVAL seconds the
+    artifact is checked for a newer version (recompiling it first if the
+    JSON source changed) and swapped in; callers that already hold the old
+    object keep using it until they are done.
+    """
+    global _current, _last_check
+
+    now = time.monotonic()
+    if _current is not None and now - _last_check < TAXONOMY_CHECK_INTERVAL:
+        return _current
+
+    with _reload_lock:
+        if _current is not None and now - _last_check < TAXONOMY_CHECK_INTERVAL:
+            return _current
+        _last_check = now
+        try:
+            if _artifact_is_stale():
+                compile_taxonomy(TAXONOMY_SOURCE, TAXONOMY_ARTIFACT)
+            if _current is None or os.stat(TAXONOMY_ARTIFACT).st_mtime_ns != _current.mtime:
+                _current = Taxonomy(TAXONOMY_ARTIFACT)
+                print(f"📚 Loaded taxonomy v{_current.version} from {TAXONOMY_ARTIFACT}")
+        except Exception as e:
+            if _current is None:
+                raise
+            print(f"⚠️ Taxonomy reload failed, keeping v{_current.version}: {e}")
+        return _current
+
+
+if __name__ == "__main__":
+    source = sys.argv[1] if len(sys.argv) > 1 else TAXONOMY_SOURCE
+    target = sys.argv[2] if len(sys.argv) > 2 else TAXONOMY_ARTIFACT
+    print(f"Compiled {source} -> {compile_taxonomy(source, target)}")
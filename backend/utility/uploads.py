@@ -0,0 +1,153 @@
+"""
+Upload buffering with a per-process memory cap.
+
+Small uploads are kept in memory; anything over UPLOAD_SPOOL_THRESHOLD, or
+that would push the process past UPLOAD_MEMORY_LIMIT bytes of buffered
+uploads, is written to a named temp file instead. Readers get the bytes
+through upload_buffer() (the in-memory buffer or an mmap of the temp file,
+no copy either way) and process pool workers open the temp file by path
+rather than receiving the document pickled.
+"""
+import io
+import mmap
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+from flask import Request
+
+load_dotenv()
+
+UPLOAD_SPOOL_THRESHOLD = int(os.getenv("UPLOAD_SPOOL_THRESHOLD", str(1024 * 1024)))
+UPLOAD_MEMORY_LIMIT = int(os.getenv("UPLOAD_MEMORY_LIMIT", str(64 * 1024 * 1024)))
+UPLOAD_TMP_DIR = os.getenv("UPLOAD_TMP_DIR") or None
+
+
+class MemoryBudget:
+    """Counts bytes reserved by in-memory uploads against a hard limit."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self._used = 0
+        self._spooled = 0
+        self._lock = threading.Lock()
+
+    def reserve(self, size) -> bool:
+        with self._lock:
+            if self._used + size > self.limit:
+                return False
+            self._used += size
+            return True
+
+    def release(self, size):
+        with self._lock:
+            self._used -= size
+
+    def count_spooled(self):
+        with self._lock:
+            self._spooled += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'memory_in_use_bytes': self._used,
+                'memory_limit_bytes': self.limit,
+                'spool_threshold_bytes': UPLOAD_SPOOL_THRESHOLD,
+                'spooled_total': self._spooled
+            }
+
+
+upload_budget = MemoryBudget(UPLOAD_MEMORY_LIMIT)
+
+
+class _BudgetedBuffer(io.BytesIO):
+    """In-memory upload whose reservation is returned when it is closed."""
+
+    def __init__(self, reserved):
+        super().__init__()
+        self._reserved = reserved
+
+    def close(self):
+        if self._reserved:
+            upload_budget.release(self._reserved)
+            self._reserved = 0
+        super().close()
+
+
+def spool_upload(content_length, filename=None):
+    """
+    Writable stream for one uploaded file. The request's Content-Length is an
+    upper bound on the file size (werkzeug never reads past it), so it is
+    what gets reserved; chunked uploads without one always go to disk. Temp
+    files keep the upload's extension for tools that sniff the format by name.
+    """
+    if content_length is not None and content_length <= UPLOAD_SPOOL_THRESHOLD:
+        if upload_budget.reserve(content_length):
+            return _BudgetedBuffer(content_length)
+    upload_budget.count_spooled()
+    suffix = os.path.splitext(filename or "")[1].lower()
+    if not suffix[1:].isalnum():
+        suffix = ""
+    return tempfile.NamedTemporaryFile(mode="w+b", prefix="upload-", suffix=suffix, dir=UPLOAD_TMP_DIR)
+
+
+class SpoolingRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return spool_upload(total_content_length, filename)
+
+
+def init_uploads(app):
+    """Buffer file uploads through spool_upload."""
+    app.request_class = SpoolingRequest
+    return app
+
+
+def upload_path(file_stream):
+    """Path of the temp file behind a spooled upload, or None if it is in memory."""
+    name = getattr(file_stream, "name", None)
+    if isinstance(name, str) and os.path.isfile(name):
+        file_stream.flush()
+        return name
+    return None
+
+
+@contextmanager
+def upload_buffer(file_stream):
+    """
+    Read-only bytes-like view of a whole upload: the BytesIO buffer itself or
+    an mmap of the file behind the stream. Falls back to read() for streams
+    that are neither. The view must not be kept past the with block.
+    """
+    if isinstance(file_stream, io.BytesIO):
+        view = file_stream.getbuffer()
+        try:
+            yield view
+        finally:
+            view.release()
+        return
+
+    try:
+        file_stream.flush()
+        fileno = file_stream.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        file_stream.seek(0)
+        yield file_stream.read()
+        return
+
+    if os.fstat(fileno).st_size == 0:
+        yield b""
+        return
+
+    mapped = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    try:
+        yield view
+    finally:
+        try:
+            view.release()
+            mapped.close()
+        except BufferError:
+            # A reader still holds a slice; the map goes away with it
+            pass
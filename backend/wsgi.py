@@ -0,0 +1,46 @@
+"""
+Production entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+APP_MODULE selects the Flask app to serve (app_memory by default, or
+Integrated). Heavy parsing libraries are imported here so that, with
+preload_app, they are loaded once in the master and shared copy-on-write by
+every forked worker.
+"""
+import importlib
+import os
+
+from gunicorn_settings import WORKER_CLASS
+
+if WORKER_CLASS == "gevent":
+    # Must run before anything imports socket, ssl or threading
+    from gevent import monkey
+    monkey.patch_all()
+
+APP_MODULE = os.getenv("APP_MODULE", "app_memory")
+
+PRELOAD_MODULES = [
+    "pdfminer.high_level",
+    "PyPDF2",
+    "fitz",
+    "unidecode",
+    "numpy",
+    "scipy.sparse",
+]
+
+
+def preload():
+    for module in PRELOAD_MODULES:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            print(f"⚠️ Preload skipped {module}: {e}")
+
+    # Compile the taxonomy artifact if needed, so workers only map it
+    from utility.taxonomy import get_taxonomy
+    get_taxonomy()
+
+
+preload()
+app = importlib.import_module(APP_MODULE).app
@@ -35,7 +35,7 @@ function ResumeUploader() {
 
   const handleUpload = async () => {
     if (!file) {
-      setError("Please select a PDF resume");
+      setError("Please select a resume (PDF, DOCX or TXT)");
       return;
     }
 
@@ -302,7 +302,7 @@ function ResumeUploader() {
           <div className="flex flex-col md:flex-row md:items-center gap-4 mb-6">
             <input
               type="file"
-              accept=".pdf"
+              accept=".pdf,.docx,.txt"
               onChange={handleChange}
               className="file:bg-blue-600 file:text-white file:rounded-md file:border-0 file:px-4 file:py-2 file:mr-4 
                        border border-gray-300 rounded-md w-full md:w-auto p-2 bg-white text-sm shadow-sm"